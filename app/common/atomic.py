@@ -15,6 +15,10 @@ from app.common.cache_service import cache_service
 from app.common.exceptions import BusinessException
 
 
+# 会话 info 中登记"提交后再删除"的缓存键
+AFTER_COMMIT_CACHE_INVALIDATION = "after_commit_cache_invalidation"
+
+
 class AtomicManager:
     """原子性管理器"""
     
@@ -33,9 +37,28 @@ class AtomicManager:
             yield db
             await db.commit()
         except Exception as e:
+            db.info.pop(AFTER_COMMIT_CACHE_INVALIDATION, None)
             if rollback_on_error:
                 await db.rollback()
             raise e
+        await self._run_after_commit_invalidation(db)
+
+    def invalidate_after_commit(self, db: AsyncSession, *keys: str, tags: Optional[List[str]] = None) -> None:
+        """
+        登记事务提交成功后才删除的缓存键/标签
+
+        提交前删除缓存时，并发读请求可能在提交前把旧数据重新写回缓存；
+        回滚时登记的键直接丢弃
+        """
+        pending = db.info.setdefault(AFTER_COMMIT_CACHE_INVALIDATION, {"keys": [], "tags": []})
+        pending["keys"].extend(keys)
+        pending["tags"].extend(tags or [])
+
+    async def _run_after_commit_invalidation(self, db: AsyncSession) -> None:
+        """执行提交后登记的缓存失效"""
+        pending = db.info.pop(AFTER_COMMIT_CACHE_INVALIDATION, None)
+        if pending and (pending["keys"] or pending["tags"]):
+            await cache_service.delete_many(*pending["keys"], tags=pending["tags"] or None)
 
     async def execute_in_transaction(self, db: AsyncSession, func: Callable, *args, **kwargs):
         """在事务中执行函数"""
@@ -385,6 +408,11 @@ def atomic_optimistic(table_name: str, id_param: str = "id",
     return atomic_manager.atomic_optimistic(table_name, id_param, version_param, max_retries)
 
 
+def invalidate_after_commit(db: AsyncSession, *keys: str, tags: Optional[List[str]] = None) -> None:
+    """登记事务提交成功后才删除的缓存键/标签"""
+    atomic_manager.invalidate_after_commit(db, *keys, tags=tags)
+
+
 async def execute_in_transaction(db: AsyncSession, func: Callable, *args, **kwargs):
     """在事务中执行函数"""
     return await atomic_manager.execute_in_transaction(db, func, *args, **kwargs)
@@ -5,15 +5,29 @@
 import json
 import hashlib
 import logging
-from typing import Optional, Any, Dict, List, Union
+import time
+from typing import Optional, Any, Dict, List, Union, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 import asyncio
 from functools import wraps
 
+from app.common.exceptions import BusinessException
 from app.common.redis_client import get_redis_client
 
 logger = logging.getLogger(__name__)
 
+# 空值缓存哨兵：记录"数据不存在"，防止不存在的键反复穿透到数据库
+CACHE_MISSING = "__missing__"
+CACHE_MISSING_TTL = 60
+
+# 回源锁：跨进程只允许一个请求回源，其余请求在等待时间内轮询缓存
+CACHE_LOAD_LOCK_TTL = 5
+CACHE_LOAD_WAIT_SECONDS = 2
+CACHE_LOAD_POLL_INTERVAL = 0.05
+
+# 标签集合过期时间：需不短于其成员键的最长 TTL，过期后残留成员随之回收
+CACHE_TAG_TTL = 86400
+
 
 class CacheService:
     """缓存服务类"""
@@ -22,6 +36,8 @@ class CacheService:
         self.redis_client = None
         self._local_cache = {}  # 本地缓存
         self._cache_lock = asyncio.Lock()  # 缓存锁，防止缓存击穿
+        self._background_tasks = set()  # 后台刷新任务，持有引用防止被回收
+        self._inflight: Dict[str, asyncio.Future] = {}  # 进程内正在回源的键
     
     async def _get_redis(self):
         """获取Redis客户端"""
@@ -54,6 +70,11 @@ class CacheService:
         }
         key_str = json.dumps(key_data, sort_keys=True)
         return f"idempotent:{hashlib.md5(key_str.encode()).hexdigest()}"
+
+    def query_digest(self, *params) -> str:
+        """根据查询参数模型生成稳定摘要（跨进程一致，不受 PYTHONHASHSEED 影响）"""
+        key_str = "|".join(param.model_dump_json() for param in params)
+        return hashlib.md5(key_str.encode()).hexdigest()
     
     async def get(self, key: str) -> Optional[Any]:
         """获取缓存"""
@@ -67,6 +88,16 @@ class CacheService:
             logger.error(f"缓存获取失败: {e}")
             return None
     
+    async def mget(self, *keys: str) -> List[Optional[Any]]:
+        """单次 MGET 读取多个缓存键，结果与 keys 顺序一致"""
+        try:
+            redis = await self._get_redis()
+            values = await redis.mget(keys)
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.error(f"批量获取缓存失败: {e}")
+            return [None] * len(keys)
+
     async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """设置缓存"""
         try:
@@ -77,6 +108,88 @@ class CacheService:
             logger.error(f"缓存设置失败: {e}")
             return False
     
+    async def get_raw(self, key: str) -> Optional[str]:
+        """获取原始字符串缓存（不做 JSON 解析，由调用方直接交给 model_validate_json）"""
+        try:
+            redis = await self._get_redis()
+            return await redis.get(key)
+        except Exception as e:
+            logger.error(f"缓存获取失败: {e}")
+            return None
+
+    async def set_raw(self, key: str, value: str, ttl: int = 3600) -> bool:
+        """设置原始字符串缓存（如 model_dump_json 的结果）"""
+        try:
+            redis = await self._get_redis()
+            await redis.set(key, value, ex=ttl)
+            return True
+        except Exception as e:
+            logger.error(f"缓存设置失败: {e}")
+            return False
+
+    async def get_or_load_raw(self, key: str, loader: Callable[[], Awaitable[str]], ttl: int) -> str:
+        """
+        获取原始字符串缓存，未命中时合并回源（single-flight）
+
+        进程内同一键只执行一次 loader，其余协程等待其结果；
+        跨进程通过 SET NX 回源锁，未抢到锁的请求短暂轮询缓存，超时后自行回源
+        """
+        cached = await self.get_raw(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 仅当回源请求本身被取消（如客户端断开）时由当前请求重新回源
+                if not inflight.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load_raw(key, loader, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 无等待者时避免 "exception was never retrieved" 告警
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _load_raw(self, key: str, loader: Callable[[], Awaitable[str]], ttl: int) -> str:
+        """持有回源锁时执行 loader 并写缓存；锁被其他进程持有时等待其写入"""
+        lock_key = f"{key}:loading"
+        redis = await self._get_redis()
+        # True=抢到锁，None=锁已被其他进程持有，False=Redis 不可用
+        locked = await redis.set(lock_key, "1", nx=True, ex=CACHE_LOAD_LOCK_TTL)
+        if locked is False:
+            # Redis 不可用时既无法等到其他进程的结果也无法写缓存，直接回源
+            return await loader()
+
+        if locked is None:
+            deadline = time.monotonic() + CACHE_LOAD_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(CACHE_LOAD_POLL_INTERVAL)
+                cached = await self.get_raw(key)
+                if cached is not None:
+                    return cached
+
+        try:
+            value = await loader()
+            await self.set_raw(key, value, ttl)
+            return value
+        finally:
+            if locked:
+                await redis.delete(lock_key)
+
     async def delete(self, key: str) -> bool:
         """删除缓存"""
         try:
@@ -99,6 +212,74 @@ class CacheService:
             logger.error(f"批量删除缓存失败: {e}")
             return False
     
+    async def set_tagged(self, key: str, value: Any, tag: str, ttl: int = 3600) -> bool:
+        """设置缓存并将键登记到标签集合，便于按标签批量失效（替代 KEYS/SCAN 模式匹配）"""
+        try:
+            redis = await self._get_redis()
+            pipe = await redis.pipeline(transaction=False)
+            pipe.set(key, json.dumps(value, default=str), ex=ttl)
+            pipe.sadd(tag, key)
+            pipe.expire(tag, CACHE_TAG_TTL)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"缓存设置失败: {e}")
+            return False
+
+    async def invalidate_tag(self, tag: str) -> bool:
+        """删除标签下登记的全部缓存键及标签本身"""
+        return await self.delete_many(tags=[tag])
+
+    async def delete_many(self, *keys: str, tags: Optional[List[str]] = None) -> bool:
+        """单条 DEL 批量删除缓存键；传入 tags 时先以管道读取标签成员，连同标签一并删除"""
+        try:
+            redis = await self._get_redis()
+            to_delete = list(keys)
+            if tags:
+                pipe = await redis.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.smembers(tag)
+                for members in await pipe.execute():
+                    to_delete.extend(members)
+                to_delete.extend(tags)
+            if to_delete:
+                await redis.delete(*to_delete)
+            return True
+        except Exception as e:
+            logger.error(f"批量删除缓存失败: {e}")
+            return False
+
+    async def get_swr(self, key: str) -> Tuple[Optional[Any], bool]:
+        """读取带软过期时间的缓存，返回 (数据, 是否已软过期)"""
+        payload = await self.get(key)
+        if not isinstance(payload, dict) or "data" not in payload:
+            return None, False
+        return payload["data"], payload.get("soft_exp", 0) <= time.time()
+
+    async def set_swr(self, key: str, value: Any, soft_ttl: int, ttl: int) -> bool:
+        """设置带软过期时间的缓存（soft_ttl 后仍可读取旧值，ttl 后彻底过期）"""
+        return await self.set(key, {"data": value, "soft_exp": time.time() + soft_ttl}, ttl)
+
+    async def refresh_swr(self, key: str, loader: Callable[[], Awaitable[Any]], soft_ttl: int, ttl: int) -> None:
+        """后台刷新已软过期的缓存（stale-while-revalidate），SET NX 保证同一时刻只有一个刷新任务"""
+        lock_key = f"{key}:refreshing"
+        redis = await self._get_redis()
+        if not await redis.set(lock_key, "1", nx=True, ex=10):
+            return
+
+        async def _refresh():
+            try:
+                await self.set_swr(key, await loader(), soft_ttl, ttl)
+            except Exception as e:
+                logger.error(f"后台刷新缓存失败: {key}, {e}")
+            finally:
+                # 刷新结束即释放锁，避免刷新失败后 10 秒内无法再次刷新
+                await redis.delete(lock_key)
+
+        task = asyncio.create_task(_refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     async def exists(self, key: str) -> bool:
         """检查缓存是否存在"""
         try:
@@ -133,7 +314,7 @@ class CacheService:
         key = f"user:{user_id}"
         return await self.get(key)
     
-    async def set_user_cache(self, user_id: int, user_data: Dict, ttl: int = 3600) -> bool:
+    async def set_user_cache(self, user_id: int, user_data: Union[Dict, str], ttl: int = 3600) -> bool:
         """设置用户缓存"""
         key = f"user:{user_id}"
         return await self.set(key, user_data, ttl)
@@ -206,6 +387,44 @@ class CacheService:
         key = self._generate_idempotent_key(user_id, operation, *args, **kwargs)
         return await self.delete(key)
     
+    async def run_idempotent(
+        self,
+        scope: str,
+        user_id: int,
+        idempotency_key: str,
+        func: Callable[[], Awaitable[Any]],
+        ttl: int = 600
+    ) -> Any:
+        """
+        基于客户端幂等键执行写操作（SET NX EX 抢占）
+
+        同一幂等键的重试请求直接返回首次执行结果，不再重复写库；
+        Redis 不可用时降级为直接执行
+        """
+        lock_key = f"idem:{scope}:{user_id}:{idempotency_key}"
+        result_key = f"idem:{scope}:result:{user_id}:{idempotency_key}"
+        redis = await self._get_redis()
+        # True=抢占成功，None=键已存在，False=Redis异常
+        claimed = await redis.set(lock_key, "1", nx=True, ex=ttl)
+        if claimed is None:
+            cached_result = await self.get(result_key)
+            if cached_result is not None:
+                return cached_result
+            raise BusinessException("请求正在处理中，请勿重复提交", code=409)
+
+        try:
+            result = await func()
+        except Exception:
+            # 执行失败释放幂等键，允许客户端重试
+            if claimed:
+                await self.delete(lock_key)
+            raise
+
+        if claimed:
+            payload = result.model_dump(mode="json") if hasattr(result, "model_dump") else result
+            await self.set(result_key, payload, ttl=ttl)
+        return result
+
     # ================ 缓存装饰器 ================
     
     def cached(self, prefix: str, ttl: int = 3600):
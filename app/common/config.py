@@ -19,9 +19,13 @@ class Settings(BaseSettings):
     # 服务器配置
     host: str
     port: int
+    # uvicorn 工作进程数（debug 热重载模式下固定为单进程）
+    workers: int = 1
     
     # 数据库配置
     database_url: str
+    # 启动时是否执行 create_all 建表（生产库由 sql/ 脚本维护，默认仅 debug 模式建表）
+    db_create_tables: bool = False
     
     # Nacos配置
     nacos_server: str
@@ -2,6 +2,7 @@
 FastAPI依赖项（微服务版本）
 从网关传递的请求头获取用户信息
 """
+from datetime import datetime
 from typing import Optional, List
 from fastapi import HTTPException, Header, Depends, Query
 from pydantic import BaseModel, Field
@@ -63,10 +64,22 @@ async def get_current_user_context(
 
 
 async def get_current_user_id(
-    user_context: UserContext = Depends(get_current_user_context)
+    header_user_id: Optional[str] = Header(None, alias=settings.user_id_header)
 ) -> int:
-    """获取当前用户ID"""
-    return user_context.user_id
+    """获取当前用户ID（仅解析网关请求头，不查询角色）"""
+    if not header_user_id:
+        raise HTTPException(
+            status_code=401, 
+            detail="缺少用户身份信息，请检查网关配置"
+        )
+    
+    try:
+        return int(header_user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, 
+            detail="用户ID格式错误"
+        )
 
 
 async def get_optional_user_context(
@@ -91,10 +104,16 @@ async def get_optional_user_context(
 
 
 async def get_optional_user_id(
-    user_context: Optional[UserContext] = Depends(get_optional_user_context)
+    header_user_id: Optional[str] = Header(None, alias=settings.user_id_header)
 ) -> Optional[int]:
-    """获取可选的当前用户ID"""
-    return user_context.user_id if user_context else None
+    """获取可选的当前用户ID（仅解析网关请求头，不查询角色）"""
+    if not header_user_id:
+        return None
+    
+    try:
+        return int(header_user_id)
+    except ValueError:
+        return None
 
 
 async def require_admin(
@@ -158,7 +177,10 @@ async def get_pagination(
     size: Optional[int] = Query(None, ge=1, le=100, description="每页数量（不推荐，推荐使用 pageSize）", deprecated=True),
     page_size: Optional[int] = Query(None, alias="pageSize", ge=1, le=100, description="每页数量（推荐）", examples={"示例": {"summary": "每页20条", "value": 20}}),
     limit: Optional[int] = Query(None, alias="limit", ge=1, le=100, description="每页数量(别名: limit)（不推荐，推荐使用 pageSize）", deprecated=True),
-    per_page: Optional[int] = Query(None, alias="per_page", ge=1, le=100, description="每页数量(别名: per_page)（不推荐，推荐使用 pageSize）", deprecated=True)
+    per_page: Optional[int] = Query(None, alias="per_page", ge=1, le=100, description="每页数量(别名: per_page)（不推荐，推荐使用 pageSize）", deprecated=True),
+    # 游标分页（支持的列表接口使用，避免深分页 OFFSET 扫描）
+    after_create_time: Optional[datetime] = Query(None, alias="afterCreateTime", description="游标：上一页最后一条记录的创建时间（与 afterId 同时提供时启用游标分页）"),
+    after_id: Optional[int] = Query(None, alias="afterId", ge=1, description="游标：上一页最后一条记录的ID")
 ) -> PaginationParams:
     """统一分页依赖：兼容多种前端命名，返回 PaginationParams
 
@@ -180,4 +202,9 @@ async def get_pagination(
         else:
             effective_page = 1
 
-    return PaginationParams(page=effective_page, page_size=effective_page_size)
\ No newline at end of file
+    return PaginationParams(
+        page=effective_page,
+        page_size=effective_page_size,
+        after_create_time=after_create_time,
+        after_id=after_id,
+    )
\ No newline at end of file
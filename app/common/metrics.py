@@ -0,0 +1,64 @@
+"""
+Prometheus 指标采集
+使用纯 ASGI 中间件统一记录请求耗时与计数，避免在各个路由处理函数中重复计时
+"""
+import time
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP请求耗时（秒）",
+    ["method", "path"],
+)
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP请求总数",
+    ["method", "path", "status"],
+)
+
+# 未匹配到路由的请求统一归为一个标签，防止任意路径导致标签基数膨胀
+UNMATCHED_PATH_LABEL = "__unmatched__"
+
+
+def _path_label(scope: Scope) -> str:
+    """使用路由模板（如 /api/v1/content/{content_id}）作为指标标签"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_PATH_LABEL
+
+
+class MetricsMiddleware:
+    """纯 ASGI 指标中间件（不使用 BaseHTTPMiddleware，避免每次请求额外构造 Request 对象）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # 在响应头发出时记录耗时，路由信息此时已写入 scope
+                REQUEST_LATENCY.labels(scope["method"], _path_label(scope)).observe(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_COUNT.labels(scope["method"], _path_label(scope), str(status_code)).inc()
+
+
+def metrics_response() -> Response:
+    """导出 Prometheus 文本格式指标"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -3,12 +3,16 @@ Nacos服务注册与发现客户端
 """
 import nacos
 import socket
+import time
 import logging
 from typing import Optional
 from app.common.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 健康检查结果缓存时间（秒）：探针频繁调用时避免每次都请求 Nacos
+HEARTBEAT_CHECK_TTL = 5
+
 
 class NacosClient:
     """Nacos客户端管理类"""
@@ -18,6 +22,9 @@ class NacosClient:
         self.service_ip = settings.service_ip or self._get_local_ip()
         self.service_port = settings.port
         self.service_name = settings.service_name
+        self._registered = False
+        self._heartbeat_ok = False
+        self._heartbeat_checked_at = 0.0
         
     def _get_local_ip(self) -> str:
         """获取本机IP地址"""
@@ -78,6 +85,7 @@ class NacosClient:
                 group_name=settings.nacos_group
             )
             
+            self._registered = True
             logger.info(f"服务注册成功: {self.service_name} ({self.service_ip}:{self.service_port})")
             return True
             
@@ -86,8 +94,8 @@ class NacosClient:
             return False
     
     def deregister_service(self) -> bool:
-        """从Nacos注销服务"""
-        if not self.client:
+        """从Nacos注销服务（信号处理与生命周期关闭都会调用，只在已注册时请求一次）"""
+        if not self.client or not self._registered:
             return True
         
         try:
@@ -99,6 +107,7 @@ class NacosClient:
                 group_name=settings.nacos_group
             )
             
+            self._registered = False
             logger.info(f"服务注销成功: {self.service_name}")
             return True
             
@@ -137,6 +146,14 @@ class NacosClient:
             logger.error(f"心跳检查失败: {e}")
             return False
     
+    def check_heartbeat(self) -> bool:
+        """带短时缓存的心跳检查（供健康检查接口使用）"""
+        now = time.monotonic()
+        if now - self._heartbeat_checked_at >= HEARTBEAT_CHECK_TTL:
+            self._heartbeat_ok = self.send_heartbeat()
+            self._heartbeat_checked_at = now
+        return self._heartbeat_ok
+    
     def get_service_instances(self, service_name: str) -> list:
         """获取指定服务的实例列表"""
         if not self.client:
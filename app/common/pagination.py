@@ -1,9 +1,11 @@
 """
 分页工具类
 """
-from typing import TypeVar, Generic, List, Any
+from datetime import datetime
+from typing import TypeVar, Generic, List, Any, Optional
 from math import ceil
 from pydantic import BaseModel, Field
+from sqlalchemy import and_, or_
 
 T = TypeVar('T')
 
@@ -12,6 +14,14 @@ class PaginationParams(BaseModel):
     """分页参数"""
     page: int = Field(default=1, ge=1, description="页码，从1开始")
     page_size: int = Field(default=20, ge=1, le=100, description="每页大小，最大100")
+    # 游标（keyset）分页：上一页最后一条记录的创建时间与ID，均提供时替代 offset 分页
+    after_create_time: Optional[datetime] = Field(default=None, description="游标：上一页最后一条记录的创建时间")
+    after_id: Optional[int] = Field(default=None, description="游标：上一页最后一条记录的ID")
+    
+    @property
+    def is_keyset(self) -> bool:
+        """是否使用游标分页"""
+        return self.after_create_time is not None and self.after_id is not None
     
     @property
     def offset(self) -> int:
@@ -40,11 +50,13 @@ class PaginationResult(BaseModel, Generic[T]):
         items: List[T],
         total: int,
         page: int,
-        page_size: int
+        page_size: int,
+        has_next: Optional[bool] = None
     ) -> "PaginationResult[T]":
-        """创建分页结果"""
+        """创建分页结果（游标分页时由调用方传入 has_next）"""
         total_pages = ceil(total / page_size) if total > 0 else 0
-        has_next = page < total_pages
+        if has_next is None:
+            has_next = page < total_pages
         has_prev = page > 1
         
         return cls(
@@ -55,4 +67,16 @@ class PaginationResult(BaseModel, Generic[T]):
             total_pages=total_pages,
             has_next=has_next,
             has_prev=has_prev
-        )
\ No newline at end of file
+        )
+
+
+def keyset_condition(create_time_column, id_column, pagination: PaginationParams):
+    """
+    游标分页条件：(create_time, id) < (after_create_time, after_id)
+
+    配合 ORDER BY create_time DESC, id DESC 使用，展开为 OR/AND 形式以便 MySQL 走索引范围扫描
+    """
+    return or_(
+        create_time_column < pagination.after_create_time,
+        and_(create_time_column == pagination.after_create_time, id_column < pagination.after_id),
+    )
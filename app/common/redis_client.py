@@ -112,6 +112,15 @@ class RedisClient:
             logger.error(f"Redis SET失败 key={key}: {e}")
             return False
     
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """批量获取字符串值（单次往返）"""
+        try:
+            async with self.redis_manager.get_redis() as redis:
+                return await redis.mget(keys)
+        except Exception as e:
+            logger.error(f"Redis MGET失败 keys={keys}: {e}")
+            return [None] * len(keys)
+    
     async def delete(self, *keys: str) -> int:
         """删除键"""
         try:
@@ -206,6 +215,31 @@ class RedisClient:
             logger.error(f"Redis HDEL失败 name={name} keys={keys}: {e}")
             return 0
     
+    # Set操作方法
+    async def sadd(self, name: str, *values: str) -> int:
+        """向集合添加成员"""
+        try:
+            async with self.redis_manager.get_redis() as redis:
+                return await redis.sadd(name, *values)
+        except Exception as e:
+            logger.error(f"Redis SADD失败 name={name}: {e}")
+            return 0
+    
+    async def smembers(self, name: str) -> set:
+        """获取集合全部成员"""
+        try:
+            async with self.redis_manager.get_redis() as redis:
+                return await redis.smembers(name)
+        except Exception as e:
+            logger.error(f"Redis SMEMBERS失败 name={name}: {e}")
+            return set()
+    
+    # 管道
+    async def pipeline(self, transaction: bool = True):
+        """获取管道：命令在 execute() 时一次性发送，异常由调用方处理"""
+        async with self.redis_manager.get_redis() as redis:
+            return redis.pipeline(transaction=transaction)
+    
     # List操作方法
     async def lpush(self, name: str, *values: str) -> int:
         """从左侧推入列表"""
@@ -32,7 +32,10 @@
    }
 """
 from typing import Any, Optional, Generic, TypeVar, List
-from pydantic import BaseModel, Field
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, TypeAdapter
 
 T = TypeVar('T')
 
@@ -113,6 +116,48 @@ class PaginationResponse(BaseResponse[List[T]], Generic[T]):
         )
 
 
+def dump_pagination_json(
+    adapter: TypeAdapter,
+    datas: List[Any],
+    total: int,
+    current_page: int,
+    page_size: int,
+    message: str = "操作成功"
+) -> bytes:
+    """
+    序列化分页响应体（列表整体序列化）
+
+    adapter 为模块级的 TypeAdapter(List[X])，整页数据一次性序列化为 JSON，
+    避免逐条经过 Pydantic 模型序列化；输出格式与 PaginationResponse 一致
+    """
+    total_page = (total + page_size - 1) // page_size if total > 0 else 0
+    return orjson.dumps({
+        "code": ResponseCode.SUCCESS,
+        "message": message,
+        "success": True,
+        "data": orjson.Fragment(adapter.dump_json(datas, by_alias=True)),
+        "total": total,
+        "currentPage": current_page,
+        "pageSize": page_size,
+        "totalPage": total_page,
+    })
+
+
+def create_pagination_json_response(
+    adapter: TypeAdapter,
+    datas: List[Any],
+    total: int,
+    current_page: int,
+    page_size: int,
+    message: str = "操作成功"
+) -> Response:
+    """构建分页响应（响应体见 dump_pagination_json）"""
+    return Response(
+        content=dump_pagination_json(adapter, datas, total, current_page, page_size, message),
+        media_type="application/json",
+    )
+
+
 # 响应码常量
 class ResponseCode:
     SUCCESS = 200
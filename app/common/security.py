@@ -2,6 +2,10 @@
 安全相关工具类
 微服务环境下只处理密码加密，认证由网关层Sa-Token处理
 """
+import asyncio
+from functools import cached_property
+from typing import Optional
+
 from passlib.context import CryptContext
 from app.common.config import settings
 
@@ -10,15 +14,40 @@ class SecurityManager:
     """安全管理器（微服务版本）"""
     
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # 使用配置的 bcrypt 轮数（cost），低于该轮数的旧哈希在登录成功后渐进升级
+        self.pwd_context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=settings.password_bcrypt_rounds,
+        )
     
     def hash_password(self, password: str) -> str:
         """密码加密"""
         return self.pwd_context.hash(password)
     
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """验证密码"""
+    @cached_property
+    def _dummy_hash(self) -> str:
+        """占位哈希：用户不存在或无密码时仍执行一次完整校验，避免耗时差异泄露账号是否存在"""
+        return self.pwd_context.hash("x" * 32)
+    
+    def verify_password(self, plain_password: str, hashed_password: Optional[str]) -> bool:
+        """验证密码（哈希为空时以占位哈希校验并返回 False，保持耗时一致）"""
+        if not hashed_password:
+            self.pwd_context.verify(plain_password, self._dummy_hash)
+            return False
         return self.pwd_context.verify(plain_password, hashed_password)
+    
+    async def hash_password_async(self, password: str) -> str:
+        """密码加密（在线程池中执行，避免 bcrypt 计算阻塞事件循环）"""
+        return await asyncio.to_thread(self.hash_password, password)
+    
+    async def verify_password_async(self, plain_password: str, hashed_password: Optional[str]) -> bool:
+        """验证密码（在线程池中执行，避免 bcrypt 计算阻塞事件循环）"""
+        return await asyncio.to_thread(self.verify_password, plain_password, hashed_password)
+    
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """判断哈希是否需要按当前策略重新生成（算法或轮数已过时）"""
+        return self.pwd_context.needs_update(hashed_password)
 
 
 # 全局安全管理器实例
@@ -1,15 +1,20 @@
 """
 异步数据库连接配置
 """
-from sqlalchemy import create_engine
+import asyncio
+import logging
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
 from app.common.config import settings
 
+logger = logging.getLogger(__name__)
+
 # 将同步数据库URL转换为异步URL
 async_database_url = settings.database_url.replace("mysql+pymysql://", "mysql+aiomysql://")
 
@@ -36,6 +41,32 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+async def warmup_async_pool(size: Optional[int] = None) -> int:
+    """预热异步连接池：启动时并发建立连接，避免首批请求承担建连与认证开销"""
+    size = size or async_engine.pool.size()
+
+    async def _warmup() -> None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(_warmup() for _ in range(size)), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        logger.warning(f"数据库连接池预热部分失败: {len(failed)}/{size}, 首个错误: {failed[0]}")
+    return size - len(failed)
+
+
+async def check_async_db() -> bool:
+    """数据库连通性检查：从异步连接池取连接执行 SELECT 1"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        logger.warning(f"数据库健康检查失败: {e}")
+        return False
+
+
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """获取异步数据库会话"""
     async with AsyncSessionLocal() as session:
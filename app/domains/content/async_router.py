@@ -1,29 +1,36 @@
 """
 内容模块异步API路由
 """
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_async_db
+from app.database.connection import get_async_db, AsyncSessionLocal
 from app.common.dependencies import (
     get_current_user_context, 
     UserContext, 
     get_pagination, 
-    get_optional_user_context,
+    get_optional_user_id,
     require_blogger_role
 )
-from app.common.response import SuccessResponse, PaginationResponse, handle_business_error, handle_system_error, handle_not_found_error
-from app.common.pagination import PaginationParams
+from app.common.cache_service import cache_service
+from app.common.response import (
+    SuccessResponse, PaginationResponse, dump_pagination_json,
+    handle_business_error, handle_system_error, handle_not_found_error
+)
+from app.common.pagination import PaginationParams, PaginationResult
 from app.common.exceptions import BusinessException
 from app.domains.content.async_service import ContentAsyncService
 from app.domains.content.schemas import (
-    ContentCreate, ContentUpdate, ContentInfo, ContentQueryParams,
+    ContentCreate, ContentUpdate, ContentInfo, ContentQueryParams, ContentBatchQuery,
     ChapterCreate, ChapterUpdate, ChapterInfo, ChapterListItem,
     ContentPaymentCreate, ContentPaymentUpdate, ContentPaymentInfo,
     UserContentPurchaseCreate, UserContentPurchaseInfo,
-    PublishContentRequest, ContentStatsUpdate, ScoreContentRequest,
-    ContentReviewStatusInfo, ContentReviewStatusQuery
+    PublishContentRequest, ContentStatsUpdate, ContentStatsBatchUpdate, ScoreContentRequest,
+    ContentReviewStatusInfo, ContentReviewStatusQuery,
+    CONTENT_INFO_LIST_ADAPTER
 )
 import logging
 
@@ -31,6 +38,34 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/content", tags=["内容管理"])
 
+# 热门/最新/推荐/趋势等公共榜单变化较慢，整页响应体短时缓存
+FEED_CACHE_TTL = 60
+
+
+async def _get_feed_response(
+    feed: str,
+    query_params: ContentQueryParams,
+    pagination: PaginationParams,
+    db: AsyncSession,
+    message: str
+) -> Response:
+    """获取公共榜单：整页 JSON 缓存，并发未命中时只回源一次，命中时跳过查询与响应模型校验"""
+    cache_key = f"content:feed:{feed}:{cache_service.query_digest(query_params, pagination)}"
+
+    async def _load() -> str:
+        result = await ContentAsyncService(db).get_content_list(query_params, pagination)
+        return dump_pagination_json(
+            CONTENT_INFO_LIST_ADAPTER,
+            result.items,
+            total=result.total,
+            current_page=result.page,
+            page_size=result.page_size,
+            message=message,
+        ).decode()
+
+    body = await cache_service.get_or_load_raw(cache_key, _load, ttl=FEED_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
+
 
 # ================ 内容管理接口 ================
 
@@ -69,10 +104,10 @@ async def create_content(
         return handle_system_error("内容创建失败，请稍后重试")
 
 
-@router.get("/{content_id}", response_model=SuccessResponse[ContentInfo], summary="获取内容详情", description="根据内容ID获取详细信息")
+@router.get("/{content_id:int}", response_model=SuccessResponse[ContentInfo], summary="获取内容详情", description="根据内容ID获取详细信息")
 async def get_content(
     content_id: int,
-    current_user: Optional[UserContext] = Depends(get_optional_user_context),
+    current_user_id: Optional[int] = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -88,8 +123,7 @@ async def get_content(
     """
     try:
         service = ContentAsyncService(db)
-        user_id = current_user.user_id if current_user else None
-        info = await service.get_content_by_id(content_id=content_id, user_id=user_id)
+        info = await service.get_content_by_id(content_id=content_id, user_id=current_user_id)
         return SuccessResponse.create(data=info)
     
     except BusinessException as e:
@@ -99,7 +133,7 @@ async def get_content(
         return handle_system_error("获取内容详情失败，请稍后重试")
 
 
-@router.put("/{content_id}", response_model=SuccessResponse[ContentInfo], summary="更新内容", description="更新已有内容信息")
+@router.put("/{content_id:int}", response_model=SuccessResponse[ContentInfo], summary="更新内容", description="更新已有内容信息")
 async def update_content(
     content_id: int,
     content_data: ContentUpdate,
@@ -139,7 +173,7 @@ async def update_content(
         return handle_system_error("更新内容失败，请稍后重试")
 
 
-@router.delete("/{content_id}", response_model=SuccessResponse[bool], summary="删除内容", description="删除指定内容及其关联章节和付费配置")
+@router.delete("/{content_id:int}", response_model=SuccessResponse[bool], summary="删除内容", description="删除指定内容及其关联章节和付费配置")
 async def delete_content(
     content_id: int,
     current_user: UserContext = Depends(require_blogger_role),
@@ -260,7 +294,7 @@ async def get_content_list(
     # 分页参数（统一依赖）
     pagination: PaginationParams = Depends(get_pagination),
     db: AsyncSession = Depends(get_async_db),
-    current_user: Optional[UserContext] = Depends(get_optional_user_context)
+    current_user_id: Optional[int] = Depends(get_optional_user_id)
 ):
     """
     获取内容列表 - 支持多维度筛选和排序
@@ -323,7 +357,7 @@ async def get_content_list(
             sort_by=sort_by,
             sort_order=sort_order
         )
-        result = await service.get_content_list(query_params, pagination, current_user_id=current_user.user_id if current_user else None)
+        result = await service.get_content_list(query_params, pagination, current_user_id=current_user_id)
         return PaginationResponse.from_pagination_result(result, "获取成功")
     except BusinessException as e:
         return PaginationResponse.create(
@@ -344,6 +378,29 @@ async def get_content_list(
         )
 
 
+@router.post("/batch", response_model=SuccessResponse[Dict[str, PaginationResult[ContentInfo]]], summary="批量查询内容列表", description="一次请求执行多个内容列表查询，减少首页等场景的请求次数")
+async def get_content_list_batch(
+    batch: ContentBatchQuery,
+    db: AsyncSession = Depends(get_async_db),
+    current_user_id: Optional[int] = Depends(get_optional_user_id)
+):
+    """
+    批量查询内容列表
+    
+    请求体 queries 的每个键对应一个子查询（筛选条件与 GET / 相同，另含 page、page_size），
+    响应 data 中以相同的键返回各自的分页结果。
+    """
+    try:
+        service = ContentAsyncService(db)
+        results = await service.get_content_list_batch(batch, current_user_id=current_user_id)
+        return SuccessResponse.create(data=results, message="获取成功")
+    except BusinessException as e:
+        return handle_business_error(e.message, e.code)
+    except Exception as e:
+        logger.error(f"批量查询内容列表失败: {str(e)}")
+        return handle_system_error("批量查询内容列表失败，请稍后重试")
+
+
 @router.post("/{content_id}/stats", response_model=SuccessResponse[bool], summary="更新内容统计", description="按类型增长浏览/点赞/评论/分享/收藏等统计")
 async def update_content_stats(
     content_id: int,
@@ -368,6 +425,23 @@ async def update_content_stats(
         return handle_system_error("更新内容统计失败，请稍后重试")
 
 
+@router.post("/stats/batch", response_model=SuccessResponse[bool], summary="批量更新内容统计", description="一次提交多条内容的浏览/点赞/评论/分享/收藏增量")
+async def update_content_stats_batch(
+    batch: ContentStatsBatchUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """批量更新内容统计数据（适用于埋点数据汇总上报）"""
+    try:
+        service = ContentAsyncService(db)
+        result = await service.increment_content_stats_batch(batch.items)
+        return SuccessResponse.create(data=result, message="统计批量更新成功")
+    except BusinessException as e:
+        return handle_business_error(e.message, e.code)
+    except Exception as e:
+        logger.error(f"批量更新内容统计失败: {str(e)}")
+        return handle_system_error("批量更新内容统计失败，请稍后重试")
+
+
 @router.post("/{content_id}/score", response_model=SuccessResponse[bool], summary="为内容评分", description="对指定内容进行1-5分评分")
 async def score_content(
     content_id: int,
@@ -431,14 +505,13 @@ async def create_chapter(
 @router.get("/{content_id}/chapters", response_model=SuccessResponse[List[ChapterListItem]], summary="获取章节列表", description="获取指定内容的章节列表（不含正文）")
 async def get_content_chapters(
     content_id: int,
-    current_user: Optional[UserContext] = Depends(get_optional_user_context),
+    current_user_id: Optional[int] = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_async_db)
 ):
     """获取内容的章节列表"""
     try:
         service = ContentAsyncService(db)
-        user_id = current_user.user_id if current_user else None
-        chapters = await service.get_content_chapters(content_id, user_id)
+        chapters = await service.get_content_chapters(content_id, current_user_id)
         return SuccessResponse.create(data=chapters, message="获取成功")
     except BusinessException as e:
         return handle_business_error(e.message, e.code)
@@ -450,14 +523,13 @@ async def get_content_chapters(
 @router.get("/chapters/{chapter_id}", response_model=SuccessResponse[ChapterInfo], summary="获取章节详情", description="根据章节ID获取章节详细信息")
 async def get_chapter(
     chapter_id: int,
-    current_user: Optional[UserContext] = Depends(get_optional_user_context),
+    current_user_id: Optional[int] = Depends(get_optional_user_id),
     db: AsyncSession = Depends(get_async_db)
 ):
     """获取章节详情"""
     try:
         service = ContentAsyncService(db)
-        user_id = current_user.user_id if current_user else None
-        chapter = await service.get_chapter_by_id(chapter_id, user_id)
+        chapter = await service.get_chapter_by_id(chapter_id, current_user_id)
         return SuccessResponse.create(data=chapter, message="获取成功")
     except BusinessException as e:
         return handle_business_error(e.message, e.code)
@@ -824,8 +896,6 @@ async def get_hot_contents(
     热门度计算基于指定天数内的内容表现。
     """
     try:
-        service = ContentAsyncService(db)
-        
         # 计算时间范围
         from datetime import datetime, timedelta
         start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
@@ -839,8 +909,7 @@ async def get_hot_contents(
             sort_by="view_count",  # 可以后续改为综合热度算法
             sort_order="desc"
         )
-        result = await service.get_content_list(query_params, pagination)
-        return PaginationResponse.from_pagination_result(result, f"获取{days}天内热门内容成功")
+        return await _get_feed_response("hot", query_params, pagination, db, f"获取{days}天内热门内容成功")
     except BusinessException as e:
         return PaginationResponse.create(
             datas=[],
@@ -869,7 +938,6 @@ async def get_latest_contents(
 ):
     """获取最新内容 - 按发布时间排序"""
     try:
-        service = ContentAsyncService(db)
         query_params = ContentQueryParams(
             content_type=content_type,
             category_id=category_id,
@@ -878,8 +946,7 @@ async def get_latest_contents(
             sort_by="publish_time",
             sort_order="desc"
         )
-        result = await service.get_content_list(query_params, pagination)
-        return PaginationResponse.from_pagination_result(result, "获取最新内容成功")
+        return await _get_feed_response("latest", query_params, pagination, db, "获取最新内容成功")
     except BusinessException as e:
         return PaginationResponse.create(
             datas=[],
@@ -908,7 +975,6 @@ async def get_recommended_contents(
 ):
     """获取推荐内容 - 按评分和热度排序"""
     try:
-        service = ContentAsyncService(db)
         query_params = ContentQueryParams(
             content_type=content_type,
             category_id=category_id,
@@ -918,8 +984,7 @@ async def get_recommended_contents(
             sort_by="score",
             sort_order="desc"
         )
-        result = await service.get_content_list(query_params, pagination)
-        return PaginationResponse.from_pagination_result(result, "获取推荐内容成功")
+        return await _get_feed_response("recommended", query_params, pagination, db, "获取推荐内容成功")
     except BusinessException as e:
         return PaginationResponse.create(
             datas=[],
@@ -948,7 +1013,6 @@ async def get_trending_contents(
 ):
     """获取趋势内容 - 按点赞数排序"""
     try:
-        service = ContentAsyncService(db)
         query_params = ContentQueryParams(
             content_type=content_type,
             category_id=category_id,
@@ -958,8 +1022,7 @@ async def get_trending_contents(
             sort_by="like_count",
             sort_order="desc"
         )
-        result = await service.get_content_list(query_params, pagination)
-        return PaginationResponse.from_pagination_result(result, "获取趋势内容成功")
+        return await _get_feed_response("trending", query_params, pagination, db, "获取趋势内容成功")
     except BusinessException as e:
         return PaginationResponse.create(
             datas=[],
@@ -979,6 +1042,37 @@ async def get_trending_contents(
         )
 
 
+async def warmup_feed_cache() -> None:
+    """启动预热：为热门/最新/推荐/趋势榜单的默认首页写入缓存，避免发布后首批请求回源"""
+    pagination = PaginationParams()
+
+    async def _warmup(handler, **kwargs) -> bool:
+        # 每个榜单使用独立会话，AsyncSession 不支持并发使用
+        async with AsyncSessionLocal() as db:
+            result = await handler(content_type=None, category_id=None, pagination=pagination, db=db, **kwargs)
+        # 处理器内部吞掉异常并返回空分页响应，只有缓存的整页 Response 才算预热成功
+        if not isinstance(result, Response):
+            logger.warning(f"内容榜单缓存预热失败: {handler.__name__}, {getattr(result, 'message', result)}")
+            return False
+        return True
+
+    results = await asyncio.gather(
+        _warmup(get_hot_contents, days=7),
+        _warmup(get_latest_contents),
+        _warmup(get_recommended_contents),
+        _warmup(get_trending_contents),
+        return_exceptions=True,
+    )
+    failed = [result for result in results if result is not True]
+    for result in failed:
+        if isinstance(result, BaseException):
+            logger.warning(f"内容榜单缓存预热失败: {result}")
+    if failed:
+        logger.warning(f"内容榜单缓存预热未完成: {len(failed)}/{len(results)} 个榜单失败")
+    else:
+        logger.info("内容榜单缓存预热完成")
+
+
 @router.get("/search", response_model=PaginationResponse[ContentInfo], summary="搜索内容", description="全文搜索内容，支持标题、描述、标签、作者搜索")
 async def search_contents(
     q: str = Query(..., min_length=1, description="搜索关键词，最少1个字符"),
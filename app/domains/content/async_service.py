@@ -2,16 +2,16 @@
 内容模块异步服务层（门面）
 拆分子服务：创建、查询、更新、章节、付费、统计、评分
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.atomic import atomic_transaction
 from app.domains.content.schemas import (
-    ContentCreate, ContentUpdate, ContentInfo, ContentQueryParams,
+    ContentCreate, ContentUpdate, ContentInfo, ContentQueryParams, ContentBatchQuery,
     ChapterCreate, ChapterUpdate, ChapterInfo, ChapterListItem,
     ContentPaymentCreate, ContentPaymentInfo,
     UserContentPurchaseCreate, UserContentPurchaseInfo,
-    PublishContentRequest, ContentStatsUpdate, ScoreContentRequest,
+    PublishContentRequest, ContentStatsUpdate, ContentStatsBatchItem, ScoreContentRequest,
     ContentReviewStatusInfo, ContentReviewStatusQuery
 )
 from app.common.pagination import PaginationParams, PaginationResult
@@ -60,9 +60,22 @@ class ContentAsyncService:
     async def get_content_list(self, query_params: ContentQueryParams, pagination: PaginationParams, current_user_id: Optional[int] = None) -> PaginationResult[ContentInfo]:
         return await ContentQueryService(self.db).get_content_list(query_params, pagination, current_user_id)
 
+    async def get_content_list_batch(self, batch: ContentBatchQuery, current_user_id: Optional[int] = None) -> Dict[str, PaginationResult[ContentInfo]]:
+        """批量执行内容列表查询（同一会话不支持并发，逐个执行；子查询多数命中列表缓存）"""
+        query_service = ContentQueryService(self.db)
+        results = {}
+        for name, item in batch.queries.items():
+            pagination = PaginationParams(page=item.page, page_size=item.page_size)
+            query_params = ContentQueryParams.model_validate(item.model_dump(exclude={"page", "page_size"}))
+            results[name] = await query_service.get_content_list(query_params, pagination, current_user_id)
+        return results
+
     async def increment_content_stats(self, content_id: int, stat_type: str, increment_value: int = 1) -> bool:
         return await ContentStatsService(self.db).increment_content_stats(content_id, stat_type, increment_value)
 
+    async def increment_content_stats_batch(self, items: List[ContentStatsBatchItem]) -> bool:
+        return await ContentStatsService(self.db).increment_content_stats_batch(items)
+
     async def score_content(self, content_id: int, user_id: int, score_request: ScoreContentRequest) -> bool:
         return await ContentRatingService(self.db).score_content(content_id, user_id, score_request)
 
@@ -111,12 +124,12 @@ class ContentAsyncService:
     async def get_content_list_by_category_name(self, category_name: str, match: str, query_params: ContentQueryParams, pagination: PaginationParams) -> PaginationResult[ContentInfo]:
         """根据分类名称查询内容 - 带缓存"""
         # 生成缓存键
-        cache_key = f"content:category:{category_name}:{match}:{hash(str(query_params.model_dump()) + str(pagination.model_dump()))}"
+        cache_key = f"content:category:{category_name}:{match}:{cache_service.query_digest(query_params, pagination)}"
         
         # 尝试从缓存获取
         cached_result = await cache_service.get(cache_key)
         if cached_result:
-            return PaginationResult.model_validate(cached_result)
+            return PaginationResult[ContentInfo].model_validate(cached_result)
 
         # 这里需要关联分类表查询，简化处理
         # 实际实现中需要根据分类名称查询分类ID，然后查询内容
@@ -133,6 +146,6 @@ class ContentAsyncService:
         )
 
         # 缓存结果（短期缓存）
-        await cache_service.set(cache_key, pagination_result.model_dump(), ttl=300)
+        await cache_service.set(cache_key, pagination_result.model_dump(mode="json"), ttl=300)
 
         return pagination_result
@@ -2,7 +2,7 @@
 内容模块数据库模型
 基于 content-simple.sql 设计
 """
-from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, SmallInteger
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, SmallInteger, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.types import DECIMAL
 
@@ -70,6 +70,13 @@ class ContentChapter(Base):
 class UserContentPurchase(Base):
     """用户内容购买记录表"""
     __tablename__ = 't_user_content_purchase'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'content_id', name='uk_user_content'),
+        # 购买校验按 (user_id, content_id, status) 过滤，覆盖索引免回表
+        Index('idx_user_content_status', 'user_id', 'content_id', 'status'),
+        # 购买记录列表按 user_id 过滤、purchase_time 倒序
+        Index('idx_user_purchase_time', 'user_id', 'purchase_time'),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='购买记录ID')
     user_id = Column(BigInteger, nullable=False, comment='用户ID')
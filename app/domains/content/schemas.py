@@ -3,8 +3,8 @@
 用于 API 请求和响应的数据验证
 """
 from datetime import datetime
-from typing import Optional, List, Literal
-from pydantic import BaseModel, Field, field_validator, field_serializer
+from typing import Optional, List, Literal, Dict
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, field_serializer
 
 
 # ================ 枚举类型 ================
@@ -348,6 +348,19 @@ class ContentQueryParams(BaseModel):
         return v
 
 
+class ContentBatchQueryItem(ContentQueryParams):
+    """批量查询中的单个子查询（内容筛选条件 + 分页）"""
+    page: int = Field(default=1, ge=1, description="页码，从1开始")
+    page_size: int = Field(default=20, ge=1, le=100, description="每页大小，最大100")
+
+
+class ContentBatchQuery(BaseModel):
+    """批量内容查询请求：一次请求执行多个列表查询（如首页的热门、最新、推荐）"""
+    queries: Dict[str, ContentBatchQueryItem] = Field(
+        ..., min_length=1, max_length=10, description="子查询集合，键为调用方自定义的结果名称，最多10个"
+    )
+
+
 # ================ 其他请求模型 ================
 
 class PublishContentRequest(BaseModel):
@@ -361,6 +374,16 @@ class ContentStatsUpdate(BaseModel):
     increment_value: int = Field(default=1, description="增量值")
 
 
+class ContentStatsBatchItem(ContentStatsUpdate):
+    """批量统计更新中的单条增量"""
+    content_id: int = Field(..., description="内容ID")
+
+
+class ContentStatsBatchUpdate(BaseModel):
+    """批量内容统计更新请求（如埋点数据定时汇总上报）"""
+    items: List[ContentStatsBatchItem] = Field(..., min_length=1, max_length=500, description="统计增量列表，最多500条")
+
+
 class ScoreContentRequest(BaseModel):
     """内容评分请求模型"""
     score: int = Field(..., ge=1, le=5, description="评分：1-5分")
@@ -396,3 +419,7 @@ class ContentReviewStatusQuery(BaseModel):
         if len(v) > 100:
             raise ValueError("一次最多查询100个内容的审核状态")
         return v
+
+
+# 模块级 TypeAdapter：整页内容列表一次性序列化
+CONTENT_INFO_LIST_ADAPTER = TypeAdapter(List[ContentInfo])
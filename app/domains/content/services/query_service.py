@@ -7,7 +7,7 @@ from app.common.cache_service import cache_service
 from app.common.exceptions import BusinessException
 from app.common.pagination import PaginationParams, PaginationResult
 from app.domains.content.models import Content, ContentChapter
-from app.domains.content.schemas import ContentInfo, ContentQueryParams, ChapterListItem, ContentReviewStatusInfo
+from app.domains.content.schemas import ContentInfo, ContentQueryParams, ChapterListItem, ContentReviewStatusInfo, CONTENT_INFO_LIST_ADAPTER
 
 
 class ContentQueryService:
@@ -41,10 +41,11 @@ class ContentQueryService:
         pagination: PaginationParams,
         current_user_id: Optional[int] = None
     ) -> PaginationResult[ContentInfo]:
-        cache_key = f"content:list:{hash(str(query_params.model_dump()) + str(pagination.model_dump()))}"
+        cache_key = f"content:list:{cache_service.query_digest(query_params, pagination)}"
         cached = await cache_service.get(cache_key)
         if cached:
-            return PaginationResult.model_validate(cached)
+            # 按 ContentInfo 重新校验，命中时与回源时输出相同的日期时间格式
+            return PaginationResult[ContentInfo].model_validate(cached)
 
         conditions = []
 
@@ -121,14 +122,24 @@ class ContentQueryService:
             "score": average_score,
         }
         order_by = order_map.get(query_params.sort_by or "create_time", Content.create_time)
-        stmt = stmt.order_by(order_by.asc() if query_params.sort_order == "asc" else order_by.desc())
 
-        total_stmt = select(func.count()).select_from(stmt.subquery())
-        total = (await self.db.execute(total_stmt)).scalar()
-        rows = await self.db.execute(stmt.offset(pagination.offset).limit(pagination.limit))
-        items = [ContentInfo.model_validate(x) for x in rows.scalars().all()]
+        # 窗口函数在同一查询中返回总数，省去单独的 COUNT 子查询往返
+        page_stmt = (
+            stmt.add_columns(func.count().over().label("total"))
+            .order_by(order_by.asc() if query_params.sort_order == "asc" else order_by.desc())
+            .offset(pagination.offset)
+            .limit(pagination.limit)
+        )
+        rows = (await self.db.execute(page_stmt)).all()
+        contents = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+        else:
+            # 当前页为空（如页码越界）时无法从结果行获得总数，回退为 COUNT 查询
+            total = (await self.db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+        items = CONTENT_INFO_LIST_ADAPTER.validate_python(contents, from_attributes=True)
         result = PaginationResult.create(items=items, total=total, page=pagination.page, page_size=pagination.page_size)
-        await cache_service.set(cache_key, result.model_dump(), ttl=300)
+        await cache_service.set(cache_key, result.model_dump(mode="json"), ttl=300)
         return result
 
     async def get_content_chapters(self, content_id: int) -> List[ChapterListItem]:
@@ -1,9 +1,22 @@
-from sqlalchemy import update
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import case, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.cache_service import cache_service
 from app.common.exceptions import BusinessException
 from app.domains.content.models import Content
+from app.domains.content.schemas import ContentStatsBatchItem
+
+# 支持增量更新的统计字段
+STAT_COLUMNS = {
+    "view_count": Content.view_count,
+    "like_count": Content.like_count,
+    "favorite_count": Content.favorite_count,
+    "comment_count": Content.comment_count,
+    "share_count": Content.share_count,
+}
 
 
 class ContentStatsService:
@@ -11,20 +24,29 @@ class ContentStatsService:
         self.db = db
 
     async def increment_content_stats(self, content_id: int, stat_type: str, increment_value: int = 1) -> bool:
-        if stat_type == "view_count":
-            await self.db.execute(update(Content).where(Content.id == content_id).values(view_count=Content.view_count + increment_value))
-        elif stat_type == "like_count":
-            await self.db.execute(update(Content).where(Content.id == content_id).values(like_count=Content.like_count + increment_value))
-        elif stat_type == "favorite_count":
-            await self.db.execute(update(Content).where(Content.id == content_id).values(favorite_count=Content.favorite_count + increment_value))
-        elif stat_type == "comment_count":
-            await self.db.execute(update(Content).where(Content.id == content_id).values(comment_count=Content.comment_count + increment_value))
-        elif stat_type == "share_count":
-            await self.db.execute(update(Content).where(Content.id == content_id).values(share_count=Content.share_count + increment_value))
-        else:
+        column = STAT_COLUMNS.get(stat_type)
+        if column is None:
             raise BusinessException("不支持的统计类型")
+        await self.db.execute(update(Content).where(Content.id == content_id).values({column: column + increment_value}))
         await self.db.commit()
         await cache_service.delete_content_cache(content_id)
         await cache_service.delete_pattern("content:*")
         return True
 
+    async def increment_content_stats_batch(self, items: List[ContentStatsBatchItem]) -> bool:
+        """批量增加统计：按内容与字段合并增量，单条 UPDATE ... CASE 语句写入"""
+        increments: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for item in items:
+            if item.increment_type not in STAT_COLUMNS:
+                raise BusinessException(f"不支持的统计类型: {item.increment_type}")
+            increments[item.increment_type][item.content_id] += item.increment_value
+
+        content_ids = {item.content_id for item in items}
+        values = {
+            STAT_COLUMNS[stat_type]: STAT_COLUMNS[stat_type] + case(per_content, value=Content.id, else_=0)
+            for stat_type, per_content in increments.items()
+        }
+        await self.db.execute(update(Content).where(Content.id.in_(content_ids)).values(values))
+        await self.db.commit()
+        await cache_service.delete_pattern("content:*")
+        return True
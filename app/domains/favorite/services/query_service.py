@@ -12,7 +12,7 @@ class FavoriteQueryService:
         self.db = db
 
     async def get_favorite_list(self, user_id: int, query: FavoriteQuery, pagination: PaginationParams) -> PaginationResult[FavoriteInfo]:
-        cache_key = f"favorite:list:{user_id}:{hash(str(query.model_dump()) + str(pagination.model_dump()))}"
+        cache_key = f"favorite:list:{user_id}:{cache_service.query_digest(query, pagination)}"
         cached = await cache_service.get(cache_key)
         if cached:
             return PaginationResult.model_validate(cached)
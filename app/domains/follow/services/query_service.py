@@ -12,7 +12,7 @@ class FollowQueryService:
         self.db = db
 
     async def get_follow_list(self, user_id: int, query: FollowQuery, pagination: PaginationParams) -> PaginationResult[FollowInfo]:
-        cache_key = f"follow:list:{user_id}:{hash(str(query.model_dump()) + str(pagination.model_dump()))}"
+        cache_key = f"follow:list:{user_id}:{cache_service.query_digest(query, pagination)}"
         cached = await cache_service.get(cache_key)
         if cached:
             return PaginationResult.model_validate(cached)
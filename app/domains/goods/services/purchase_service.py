@@ -4,7 +4,7 @@
 """
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlalchemy import select, and_, update
+from sqlalchemy import select, and_, update, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.exceptions import BusinessException
@@ -187,16 +187,16 @@ class GoodsPurchaseService:
             raise BusinessException("内容不存在")
         
         # 检查用户是否已经购买过该内容
-        existing_purchase = await self.db.execute(
-            select(UserContentPurchase).where(
+        already_purchased = await self.db.scalar(
+            select(exists().where(
                 and_(
                     UserContentPurchase.user_id == order.user_id,
                     UserContentPurchase.content_id == goods.content_id,
                     UserContentPurchase.status == "ACTIVE"
                 )
-            )
+            ))
         )
-        if existing_purchase.scalar_one_or_none():
+        if already_purchased:
             # 用户已经购买过该内容，不需要重复创建记录
             return
         
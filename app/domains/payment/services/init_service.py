@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import httpx
 import orjson
@@ -14,6 +14,28 @@ from app.domains.payment.models import PaymentChannel, PaymentOrder
 from app.domains.payment.request_log_models import PaymentRequestLog
 
 
+# 支付网关共享客户端：复用连接池与 keep-alive，避免每次下单都重新建立 TCP/TLS 连接
+_gateway_client: Optional[httpx.AsyncClient] = None
+
+
+def get_gateway_client() -> httpx.AsyncClient:
+    global _gateway_client
+    if _gateway_client is None or _gateway_client.is_closed:
+        _gateway_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=3.0, read=5.0, write=5.0, pool=3.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _gateway_client
+
+
+async def close_gateway_client() -> None:
+    """关闭支付网关客户端（应用关闭时调用）"""
+    global _gateway_client
+    if _gateway_client is not None:
+        await _gateway_client.aclose()
+        _gateway_client = None
+
+
 class PaymentInitService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -105,9 +127,7 @@ class PaymentInitService:
         platform_order_no_resp = None
         upstream_json = None
         try:
-            timeout = httpx.Timeout(connect=3.0, read=5.0, write=5.0, pool=3.0)
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(url, json=req_body, headers={"Content-Type": "application/json"})
+            resp = await get_gateway_client().post(url, json=req_body, headers={"Content-Type": "application/json"})
             http_status = resp.status_code
             resp_text = resp.text
             data = resp.json()
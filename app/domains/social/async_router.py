@@ -10,6 +10,7 @@ from app.common.response import SuccessResponse, PaginationResponse
 from app.common.pagination import PaginationParams
 from app.common.dependencies import get_current_user_context, UserContext, get_pagination, require_vip_or_blogger, require_blogger_for_paid_content
 from app.common.exceptions import BusinessException
+from app.common.cache_service import cache_service
 from app.domains.social.async_service import SocialAsyncService
 from app.domains.social.schemas import DynamicCreate, DynamicUpdate, DynamicInfo, DynamicQuery, DynamicReviewStatusInfo, DynamicReviewStatusQuery, DynamicReviewRequest, PaidDynamicCreate, PaidDynamicInfo, DynamicPurchaseRequest, DynamicPurchaseInfo, DynamicWithPaidInfo, DynamicWithFollowInfo
 
@@ -320,6 +321,7 @@ async def create_paid_dynamic(
 async def purchase_dynamic(
     dynamic_id: int,
     request: DynamicPurchaseRequest,
+    idempotency_key: str = Query(..., alias="idempotencyKey", max_length=64, description="幂等键（客户端重试时保持不变）"),
     current_user: UserContext = Depends(get_current_user_context),
     db: AsyncSession = Depends(get_async_db),
 ):
@@ -327,10 +329,15 @@ async def purchase_dynamic(
     购买动态
     
     用户购买付费动态，需要消耗金币
+    
+    - **idempotencyKey**: 幂等键（必填），超时重试时保持不变，重复提交返回首次购买结果
     """
     try:
         service = SocialAsyncService(db)
-        purchase_info = await service.purchase_dynamic(dynamic_id, current_user.user_id)
+        purchase_info = await cache_service.run_idempotent(
+            "dynamic_purchase", current_user.user_id, idempotency_key,
+            lambda: service.purchase_dynamic(dynamic_id, current_user.user_id)
+        )
         return SuccessResponse.create(data=purchase_info, message="购买成功")
     except BusinessException as e:
         raise HTTPException(status_code=400, detail=e.message)
@@ -2,7 +2,7 @@
 社交动态模块数据库模型
 与 sql/social-simple.sql 保持一致
 """
-from sqlalchemy import Column, BigInteger, String, Text, DateTime, Integer, Boolean
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, Integer, Boolean, UniqueConstraint, Index
 from sqlalchemy.sql import func
 
 from app.database.connection import Base
@@ -56,6 +56,11 @@ class SocialPaidDynamic(Base):
 class SocialDynamicPurchase(Base):
     """动态购买记录表"""
     __tablename__ = "t_social_dynamic_purchase"
+    __table_args__ = (
+        UniqueConstraint("dynamic_id", "buyer_id", name="uk_dynamic_buyer"),
+        # 购买记录列表按 buyer_id 过滤、purchase_time 倒序
+        Index("idx_buyer_purchase_time", "buyer_id", "purchase_time"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment="购买记录ID")
     dynamic_id = Column(BigInteger, nullable=False, comment="动态ID")
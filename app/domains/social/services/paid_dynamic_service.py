@@ -2,7 +2,7 @@
 付费动态服务
 """
 from typing import Optional, List
-from sqlalchemy import select, insert, update, and_, func
+from sqlalchemy import select, insert, update, and_, func, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.exceptions import BusinessException
@@ -75,12 +75,7 @@ class PaidDynamicService:
                 raise BusinessException("付费动态不存在或已下架")
             
             # 检查是否已经购买过
-            existing_purchase = await self.db.execute(
-                select(SocialDynamicPurchase).where(
-                    and_(SocialDynamicPurchase.dynamic_id == dynamic_id, SocialDynamicPurchase.buyer_id == buyer_id)
-                )
-            )
-            if existing_purchase.scalar_one_or_none():
+            if await self.check_user_purchased(dynamic_id, buyer_id):
                 raise BusinessException("您已经购买过此动态")
             
             # 检查用户金币余额（这里需要调用用户钱包服务）
@@ -117,12 +112,11 @@ class PaidDynamicService:
 
     async def check_user_purchased(self, dynamic_id: int, user_id: int) -> bool:
         """检查用户是否已购买动态"""
-        purchase = await self.db.execute(
-            select(SocialDynamicPurchase).where(
+        return await self.db.scalar(
+            select(exists().where(
                 and_(SocialDynamicPurchase.dynamic_id == dynamic_id, SocialDynamicPurchase.buyer_id == user_id)
-            )
+            ))
         )
-        return purchase.scalar_one_or_none() is not None
 
     async def get_dynamic_with_paid_info(self, dynamic: SocialDynamic, current_user_id: Optional[int] = None) -> DynamicWithPaidInfo:
         """获取带付费信息的动态"""
@@ -8,7 +8,6 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from urllib.parse import urlparse, parse_qs
 
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -44,6 +43,9 @@ class StorageAsyncService:
 
     def _init_s3_client(self):
         """初始化S3客户端"""
+        # boto3 导入较重（约 200ms），延迟到首次使用存储服务时再导入，缩短服务冷启动
+        import boto3
+
         try:
             return boto3.client(
                 's3',
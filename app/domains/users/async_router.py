@@ -12,9 +12,13 @@ from app.domains.users.services.blogger_service import BloggerService
 from app.domains.users.schemas import (
     UserUpdateRequest, PasswordChangeRequest, UserBlockRequest,
     UserInfo, UserWalletInfo, UserBlockInfo, UserQuery,
-    BloggerApplicationCreate, BloggerApplicationInfo
+    BloggerApplicationCreate, BloggerApplicationInfo,
+    USER_INFO_LIST_ADAPTER, USER_BLOCK_INFO_LIST_ADAPTER
+)
+from app.common.response import (
+    SuccessResponse, PaginationResponse, create_pagination_json_response,
+    handle_business_error, handle_system_error
 )
-from app.common.response import SuccessResponse, PaginationResponse, handle_business_error, handle_system_error
 from app.common.dependencies import get_current_user_id, get_pagination, get_current_user_context, UserContext
 from app.common.pagination import PaginationParams
 from app.common.exceptions import BusinessException
@@ -123,7 +127,8 @@ async def get_user_list(
             status=status
         )
         result = await user_service.get_user_list(query, pagination)
-        return PaginationResponse.create(
+        return create_pagination_json_response(
+            USER_INFO_LIST_ADAPTER,
             datas=result.items,
             total=result.total,
             current_page=result.page,
@@ -238,7 +243,8 @@ async def get_block_list(
     try:
         user_service = UserAsyncService(db)
         result = await user_service.get_block_list(current_user_id, pagination)
-        return PaginationResponse.create(
+        return create_pagination_json_response(
+            USER_BLOCK_INFO_LIST_ADAPTER,
             datas=result.items,
             total=result.total,
             current_page=result.page,
@@ -2,10 +2,14 @@
 用户模块异步服务层（门面）
 将原有大而全的逻辑拆分到 services/ 子模块：查询、资料、认证、钱包、拉黑等
 """
+import logging
+import secrets
+import string
 from typing import Optional, List, Dict
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, insert, delete, and_, or_, func
+from sqlalchemy import select, update, insert, delete, and_, or_, func, literal, union_all
+from sqlalchemy.exc import IntegrityError
 
 from app.domains.users.schemas import (
     UserCreate,
@@ -17,79 +21,117 @@ from app.domains.users.schemas import (
     UserUpdateRequest,
     UserLoginIdentifierRequest,
     UserByIdentifierResponse,
+    USER_BLOCK_INFO_LIST_ADAPTER,
 )
-from app.common.pagination import PaginationParams, PaginationResult
+from app.common.pagination import PaginationParams, PaginationResult, keyset_condition
 from app.common.exceptions import BusinessException
 from app.common.cache_service import cache_service
-from app.common.atomic import atomic_transaction, atomic_lock, execute_in_transaction
-from app.domains.users.services.query_service import UserQueryService
+from app.common.atomic import atomic_transaction, atomic_lock, execute_in_transaction, invalidate_after_commit
+from app.common.security import security_manager
+from app.domains.users.services.query_service import UserQueryService, USER_LIST_CACHE_TAG
 from app.domains.users.services.profile_service import UserProfileService
 from app.domains.users.services.auth_service import UserAuthService
 from app.domains.users.services.wallet_service import UserWalletService
 from app.domains.users.services.coin_purchase_service import CoinPurchaseService
-from app.domains.users.models import User, UserBlock, Role, UserRole
+from app.domains.users.models import User, UserBlock, Role, UserRole, UserWallet
+
+
+logger = logging.getLogger(__name__)
+
+# 邀请码字符集与长度（36^8 空间，冲突概率极低）
+INVITE_CODE_ALPHABET = string.ascii_uppercase + string.digits
+INVITE_CODE_LENGTH = 8
+INVITE_CODE_MAX_ATTEMPTS = 3
+
+
+def _generate_invite_code() -> str:
+    """生成随机邀请码"""
+    return ''.join(secrets.choice(INVITE_CODE_ALPHABET) for _ in range(INVITE_CODE_LENGTH))
 
 
 class UserAsyncService:
-    """用户异步服务类 - 增强版"""
+    """用户异步服务类 - 增强版
+
+    写操作以 @atomic_transaction() 作为事务边界（工作单元）：方法及其委托的子服务内部不再单独 commit，
+    由装饰器在方法结束时统一提交、异常时统一回滚
+    """
 
     def __init__(self, db: AsyncSession):
         self.db = db
         # 门面不再直接处理密码加密校验，交由 UserAuthService
 
+    async def _hash_password(self, password: str) -> str:
+        """密码加密（复用全局 security_manager，线程池执行）"""
+        return await security_manager.hash_password_async(password)
+
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """验证密码（线程池执行）"""
+        return await security_manager.verify_password_async(plain_password, hashed_password)
+
     @atomic_transaction()
     async def create_user(self, req) -> UserInfo:
         """创建用户 - 带原子性事务"""
         from app.domains.users.schemas import UserCreateRequest
         
-        # 检查用户名是否已存在
-        existing_user = (await self.db.execute(
-            select(User).where(User.username == req.username)
-        )).scalar_one_or_none()
-        
-        if existing_user:
-            raise BusinessException("用户名已存在")
-
-        # 检查邮箱是否已存在
+        # 一次查询检查用户名/邮箱/手机号冲突（唯一索引兜底并发插入）
+        conflict_conditions = [User.username == req.username]
         if req.email:
-            existing_email = (await self.db.execute(
-                select(User).where(User.email == req.email)
-            )).scalar_one_or_none()
-            
-            if existing_email:
-                raise BusinessException("邮箱已被注册")
-
-        # 检查手机号是否已存在
+            conflict_conditions.append(User.email == req.email)
         if req.phone:
-            existing_phone = (await self.db.execute(
-                select(User).where(User.phone == req.phone)
-            )).scalar_one_or_none()
-            
-            if existing_phone:
-                raise BusinessException("手机号已被注册")
+            conflict_conditions.append(User.phone == req.phone)
+        conflicts = (await self.db.execute(
+            select(User.username, User.email, User.phone).where(or_(*conflict_conditions)).limit(3)
+        )).all()
+
+        if any(row.username == req.username for row in conflicts):
+            raise BusinessException("用户名已存在")
+        if req.email and any(row.email == req.email for row in conflicts):
+            raise BusinessException("邮箱已被注册")
+        if req.phone and any(row.phone == req.phone for row in conflicts):
+            raise BusinessException("手机号已被注册")
 
         # 创建用户
-        # 密码加密仍保留在此处，避免扩散改动
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         if req.password:
-            hashed_password = pwd_context.hash(req.password)
+            hashed_password = await self._hash_password(req.password)
         else:
-            import secrets, string
             random_password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(12))
-            hashed_password = pwd_context.hash(random_password)
+            hashed_password = await self._hash_password(random_password)
         
-        user = User(
-            username=req.username,
-            email=req.email,
-            phone=req.phone,
-            nickname=req.nickname,
-            password_hash=hashed_password,
-            status="active"
-        )
+        # 解析邀请人（注册时填写的他人邀请码）
+        inviter_id = None
+        if getattr(req, "invite_code", None):
+            inviter_id = (await self.db.execute(
+                select(User.id).where(User.invite_code == req.invite_code)
+            )).scalar_one_or_none()
+            if inviter_id is None:
+                # 无效邀请码不影响注册，仅不记录邀请关系
+                logger.warning(f"注册邀请码无效，已忽略: {req.invite_code}")
         
-        self.db.add(user)
-        await self.db.flush() # 使用 flush 来获取新 user 的 ID
+        # 邀请码依赖 uk_invite_code 唯一索引保证唯一，仅在极少数冲突时重新生成
+        for _ in range(INVITE_CODE_MAX_ATTEMPTS):
+            user = User(
+                username=req.username,
+                email=req.email,
+                phone=req.phone,
+                nickname=req.nickname,
+                password_hash=hashed_password,
+                invite_code=_generate_invite_code(),
+                inviter_id=inviter_id,
+                status="active"
+            )
+            try:
+                async with self.db.begin_nested():
+                    self.db.add(user)
+                    await self.db.flush() # 使用 flush 来获取新 user 的 ID
+                break
+            except IntegrityError as e:
+                if "invite_code" not in str(e.orig):
+                    raise BusinessException("用户名、邮箱或手机号已被注册")
+        else:
+            raise BusinessException("邀请码生成失败，请稍后重试")
+
+        if inviter_id is not None:
+            await self._update_inviter_count(inviter_id)
 
         # 2. 查找目标角色（默认 user）
         target_role_name = getattr(req, "role", None) or 'user'
@@ -107,23 +149,29 @@ class UserAsyncService:
             self.db.add(user_role)
             await self.db.flush()
 
-        # 3. 在 t_user_role 中创建关联
-        user_role_link = UserRole(user_id=user.id, role_id=user_role.id)
-        self.db.add(user_role_link)
-
-        await self.db.commit()
+        # 3. 在 t_user_role 中创建关联，并在同一事务内创建钱包（与角色关联一起在提交时批量写入）
+        self.db.add_all([
+            UserRole(user_id=user.id, role_id=user_role.id),
+            UserWallet(user_id=user.id),
+        ])
+        await self.db.flush()
         await self.db.refresh(user)
 
-        # 清除相关缓存
-        await cache_service.delete_pattern("user:*")
+        # 清除相关缓存（事务提交后执行）：该用户可能残留的空值缓存，以及用户列表缓存
+        invalidate_after_commit(
+            self.db, f"user:{user.id}", f"user:username:{user.username}", tags=[USER_LIST_CACHE_TAG]
+        )
         
-        # 附带角色列表
-        roles_stmt = select(Role.name).join(UserRole, Role.id == UserRole.role_id).where(UserRole.user_id == user.id)
-        roles_result = await self.db.execute(roles_stmt)
-        roles = [row[0] for row in roles_result.all()] or ["user"]
-        user_dict = UserInfo.model_validate(user).model_dump()
-        user_dict["roles"] = roles
-        return UserInfo(**user_dict)
+        # 新用户仅有刚分配的角色，无需再查询角色表
+        user_info = UserInfo.model_validate(user)
+        user_info.roles = [user_role.name]
+        return user_info
+
+    async def _update_inviter_count(self, inviter_id: int) -> None:
+        """邀请人数原子自增（单条 UPDATE，无需加载邀请人记录）"""
+        await self.db.execute(
+            update(User).where(User.id == inviter_id).values(invited_count=User.invited_count + 1)
+        )
 
     async def get_user_by_id(self, user_id: int) -> UserInfo:
         return await UserQueryService(self.db).get_user_by_id(user_id)
@@ -143,17 +191,16 @@ class UserAsyncService:
             raise BusinessException("用户不存在")
 
         await self.db.execute(delete(User).where(User.id == user_id))
-        await self.db.commit()
 
-        # 清除相关缓存
-        await cache_service.delete_user_cache(user_id)
-        await cache_service.delete_pattern(f"user:username:*")
+        # 清除相关缓存（事务提交后执行）
+        invalidate_after_commit(self.db, f"user:{user_id}", f"user:username:{user.username}")
 
         return True
 
     async def get_user_list(self, query: UserQuery, pagination: PaginationParams) -> PaginationResult[UserInfo]:
         return await UserQueryService(self.db).get_user_list(query, pagination)
 
+    @atomic_transaction()
     async def authenticate_user(self, username: str, password: str):
         return await UserAuthService(self.db).authenticate_user(username, password)
 
@@ -164,17 +211,16 @@ class UserAsyncService:
         if not user:
             raise BusinessException("用户不存在")
 
-        if not self._verify_password(old_password, user.password_hash):
+        if not await self._verify_password(old_password, user.password_hash):
             raise BusinessException("原密码错误")
 
-        hashed_new_password = self._hash_password(new_password)
+        hashed_new_password = await self._hash_password(new_password)
         await self.db.execute(
             update(User).where(User.id == user_id).values(password_hash=hashed_new_password)
         )
-        await self.db.commit()
 
-        # 清除相关缓存
-        await cache_service.delete_user_cache(user_id)
+        # 清除相关缓存（事务提交后执行）
+        invalidate_after_commit(self.db, f"user:{user_id}")
 
         return True
 
@@ -185,15 +231,13 @@ class UserAsyncService:
         if not user:
             raise BusinessException("用户不存在")
 
-        hashed_new_password = self._hash_password(new_password)
+        hashed_new_password = await self._hash_password(new_password)
         await self.db.execute(
             update(User).where(User.email == email).values(password_hash=hashed_new_password)
         )
-        await self.db.commit()
 
-        # 清除相关缓存
-        await cache_service.delete_user_cache(user.id)
-        await cache_service.delete_pattern(f"user:username:*")
+        # 清除相关缓存（事务提交后执行）
+        invalidate_after_commit(self.db, f"user:{user.id}", f"user:username:{user.username}")
 
         return True
 
@@ -228,6 +272,7 @@ class UserAsyncService:
         # 使用分布式锁确保并发安全
         return True
 
+    @atomic_transaction()
     async def get_user_wallet(self, user_id: int):
         return await UserWalletService(self.db).get_user_wallet(user_id)
 
@@ -245,27 +290,47 @@ class UserAsyncService:
         from app.domains.users.models import UserBlock
         
         # 构建查询
-        stmt = select(UserBlock).where(UserBlock.user_id == user_id).order_by(UserBlock.create_time.desc())
-        
-        # 计算总数
+        stmt = select(UserBlock).where(UserBlock.user_id == user_id)
+        order_by = (UserBlock.create_time.desc(), UserBlock.id.desc())
         total_stmt = select(func.count()).select_from(stmt.subquery())
-        total_result = await self.db.execute(total_stmt)
-        total = total_result.scalar()
         
-        # 分页查询
-        stmt = stmt.offset(pagination.offset).limit(pagination.limit)
-        result = await self.db.execute(stmt)
-        block_records = result.scalars().all()
+        has_next = None
+        if pagination.is_keyset:
+            # 游标分页：总数走短期缓存（拉黑/取消拉黑时按键清除），多取一条判断是否有下一页
+            count_key = f"user:block:count:{user_id}"
+            total = await cache_service.get(count_key)
+            if total is None:
+                total = (await self.db.execute(total_stmt)).scalar()
+                await cache_service.set(count_key, total, ttl=60)
+            stmt = (
+                stmt.where(keyset_condition(UserBlock.create_time, UserBlock.id, pagination))
+                .order_by(*order_by)
+                .limit(pagination.limit + 1)
+            )
+            block_records = (await self.db.execute(stmt)).scalars().all()
+            has_next = len(block_records) > pagination.limit
+            block_records = block_records[:pagination.limit]
+        else:
+            # 计算总数
+            total_result = await self.db.execute(total_stmt)
+            total = total_result.scalar()
+            
+            # 分页查询
+            stmt = stmt.order_by(*order_by).offset(pagination.offset).limit(pagination.limit)
+            result = await self.db.execute(stmt)
+            block_records = result.scalars().all()
         
-        block_info_list = [UserBlockInfo.model_validate(record) for record in block_records]
+        block_info_list = USER_BLOCK_INFO_LIST_ADAPTER.validate_python(block_records, from_attributes=True)
         
         return PaginationResult.create(
             items=block_info_list,
             total=total,
             page=pagination.page,
-            page_size=pagination.page_size
+            page_size=pagination.page_size,
+            has_next=has_next
         )
 
+    @atomic_transaction()
     async def update_user_info(self, user_id: int, request):
         """更新用户信息"""
         from app.domains.users.schemas import UserUpdateRequest
@@ -293,11 +358,11 @@ class UserAsyncService:
             await self.db.execute(
                 update(User).where(User.id == user_id).values(**update_data)
             )
-            await self.db.commit()
+            await self.db.flush()
             await self.db.refresh(user)
         
-        # 清除相关缓存
-        await cache_service.delete_user_cache(user_id)
+        # 清除相关缓存（事务提交后执行）
+        invalidate_after_commit(self.db, f"user:{user_id}")
         
         # 返回带角色信息
         roles_stmt = select(Role.name).join(UserRole, Role.id == UserRole.role_id).where(UserRole.user_id == user.id)
@@ -313,15 +378,18 @@ class UserAsyncService:
         
         identifier = request.identifier
         
-        # 尝试通过用户名、邮箱或手机号查找
+        # 尝试通过用户名、邮箱或手机号查找：拆为 UNION ALL 三个单列等值查询，各自走唯一索引，
+        # 避免 OR 条件退化为 index_merge 或全表扫描；按用户名 > 邮箱 > 手机号优先级取第一条
+        matched_ids = union_all(
+            select(User.id.label("id"), literal(1).label("priority")).where(User.username == identifier),
+            select(User.id.label("id"), literal(2).label("priority")).where(User.email == identifier),
+            select(User.id.label("id"), literal(3).label("priority")).where(User.phone == identifier),
+        ).subquery()
         user = (await self.db.execute(
-            select(User).where(
-                or_(
-                    User.username == identifier,
-                    User.email == identifier,
-                    User.phone == identifier
-                )
-            )
+            select(User)
+            .join(matched_ids, User.id == matched_ids.c.id)
+            .order_by(matched_ids.c.priority)
+            .limit(1)
         )).scalar_one_or_none()
         
         if user:
@@ -340,26 +408,24 @@ class UserAsyncService:
                 exists=False
             )
 
+    @atomic_transaction()
     async def update_login_info(self, user_id: int) -> bool:
-        """更新用户登录信息"""
-        user = (await self.db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-        if not user:
-            raise BusinessException("用户不存在")
-        
-        # 更新登录信息
-        await self.db.execute(
+        """更新用户登录信息（单条原子 UPDATE，通过影响行数判断用户是否存在）"""
+        result = await self.db.execute(
             update(User).where(User.id == user_id).values(
                 last_login_time=func.current_timestamp(),
                 login_count=User.login_count + 1
             )
         )
-        await self.db.commit()
+        if result.rowcount == 0:
+            raise BusinessException("用户不存在")
         
-        # 清除相关缓存
-        await cache_service.delete_user_cache(user_id)
+        # 清除相关缓存（事务提交后执行）
+        invalidate_after_commit(self.db, f"user:{user_id}")
         
         return True
 
+    @atomic_transaction()
     async def verify_user_password(self, request):
         """验证用户密码"""
         from app.domains.users.schemas import UserPasswordVerifyRequest
@@ -368,7 +434,14 @@ class UserAsyncService:
         if not user:
             raise BusinessException("用户不存在")
         
-        return self._verify_password(request.password, user.password_hash)
+        verified = await self._verify_password(request.password, user.password_hash)
+        if verified and security_manager.needs_rehash(user.password_hash):
+            # 旧哈希轮数低于当前配置时重新加密保存
+            new_hash = await self._hash_password(request.password)
+            await self.db.execute(
+                update(User).where(User.id == user.id).values(password_hash=new_hash)
+            )
+        return verified
 
     # ==================== 金币购买相关方法 ====================
     
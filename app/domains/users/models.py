@@ -2,7 +2,8 @@
 用户模块数据库模型
 """
 from sqlalchemy import Column, BigInteger, String, DateTime, SmallInteger, Integer
-from sqlalchemy import Date, Text
+from sqlalchemy import Date, Text, Index, UniqueConstraint
+from sqlalchemy.orm import foreign, relationship
 from sqlalchemy.sql import func
 from sqlalchemy.types import DECIMAL
 
@@ -49,6 +50,18 @@ class User(Base):
     update_time = Column(DateTime, nullable=False, server_default=func.current_timestamp(),
                         onupdate=func.current_timestamp(), comment='更新时间')
 
+    # 用户角色（只读，经 t_user_role 关联；表间无外键，需显式声明关联条件）
+    # lazy="raise" 防止异步会话中隐式懒加载，查询时须通过 joinedload/selectinload 显式加载
+    # 不命名为 roles，避免 UserInfo.model_validate 时与 roles: List[str] 字段冲突
+    role_entities = relationship(
+        "Role",
+        secondary="t_user_role",
+        primaryjoin="User.id == foreign(UserRole.user_id)",
+        secondaryjoin="Role.id == foreign(UserRole.role_id)",
+        viewonly=True,
+        lazy="raise",
+    )
+
 
 class Role(Base):
     """角色表"""
@@ -64,6 +77,9 @@ class Role(Base):
 class UserRole(Base):
     """用户角色关联表"""
     __tablename__ = 't_user_role'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'role_id', name='uk_user_role'),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='主键ID')
     user_id = Column(BigInteger, nullable=False, comment='用户ID')
@@ -76,7 +92,7 @@ class UserWallet(Base):
     __tablename__ = 't_user_wallet'
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='钱包ID')
-    user_id = Column(BigInteger, nullable=False, comment='用户ID')
+    user_id = Column(BigInteger, nullable=False, unique=True, comment='用户ID')
     balance = Column(DECIMAL(15, 2), nullable=False, default=0.00, comment='余额')
     frozen_amount = Column(DECIMAL(15, 2), nullable=False, default=0.00, comment='冻结金额')
     coin_balance = Column(BigInteger, nullable=False, default=0, comment='金币余额')
@@ -93,6 +109,9 @@ class UserWallet(Base):
 class UserBlock(Base):
     """用户拉黑表"""
     __tablename__ = 't_user_block'
+    __table_args__ = (
+        Index('idx_user_create_time', 'user_id', 'create_time'),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True, comment='拉黑ID')
     user_id = Column(BigInteger, nullable=False, comment='拉黑者用户ID')
@@ -5,7 +5,7 @@
 from typing import Optional, Union, List
 from datetime import datetime, date
 from decimal import Decimal
-from pydantic import BaseModel, Field, EmailStr, validator, model_validator, field_validator
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, validator, model_validator, field_validator, computed_field
 import re
 
 
@@ -200,20 +200,62 @@ class UserByIdentifierResponse(BaseModel):
     exists: bool = Field(description="用户是否存在")
 
 
+# 钱包金额字段：以整数“分”传输，展示用的元字符串由 computed_field 生成
+_WALLET_AMOUNT_FIELDS = ("balance", "frozen_amount", "total_income", "total_expense")
+
+
+def _to_cents(value) -> int:
+    """金额（元）转换为整数分"""
+    return int((Decimal(str(value or 0)) * 100).to_integral_value())
+
+
 class UserWalletInfo(BaseModel):
     """用户钱包信息"""
     user_id: int = Field(description="用户ID")
-    balance: Decimal = Field(description="现金余额")
-    frozen_amount: Decimal = Field(description="冻结金额")
+    balance_cents: int = Field(description="现金余额（分）")
+    frozen_amount_cents: int = Field(description="冻结金额（分）")
     coin_balance: int = Field(description="金币余额")
     coin_total_earned: int = Field(description="累计获得金币")
     coin_total_spent: int = Field(description="累计消费金币")
-    total_income: Decimal = Field(description="总收入")
-    total_expense: Decimal = Field(description="总支出")
+    total_income_cents: int = Field(description="总收入（分）")
+    total_expense_cents: int = Field(description="总支出（分）")
     status: str = Field(description="钱包状态")
     
     model_config = {"from_attributes": True}
 
+    @model_validator(mode="before")
+    @classmethod
+    def _amounts_to_cents(cls, data):
+        """兼容ORM对象与旧缓存：将 Decimal 元金额转换为整数分"""
+        if not isinstance(data, dict):
+            data = {name: getattr(data, name, None) for name in (*cls.model_fields, *_WALLET_AMOUNT_FIELDS)}
+        else:
+            data = dict(data)
+        for name in _WALLET_AMOUNT_FIELDS:
+            if data.get(f"{name}_cents") is None:
+                data[f"{name}_cents"] = _to_cents(data.get(name))
+        return data
+
+    @computed_field(description="现金余额（已废弃，请使用 balance_cents）")
+    @property
+    def balance(self) -> str:
+        return f"{self.balance_cents / 100:.2f}"
+
+    @computed_field(description="冻结金额（已废弃，请使用 frozen_amount_cents）")
+    @property
+    def frozen_amount(self) -> str:
+        return f"{self.frozen_amount_cents / 100:.2f}"
+
+    @computed_field(description="总收入（已废弃，请使用 total_income_cents）")
+    @property
+    def total_income(self) -> str:
+        return f"{self.total_income_cents / 100:.2f}"
+
+    @computed_field(description="总支出（已废弃，请使用 total_expense_cents）")
+    @property
+    def total_expense(self) -> str:
+        return f"{self.total_expense_cents / 100:.2f}"
+
 
 class UserBlockInfo(BaseModel):
     """用户拉黑信息"""
@@ -254,4 +296,12 @@ class BloggerApplicationInfo(BaseModel):
     create_time: datetime = Field(description="申请时间")
     update_time: datetime = Field(description="更新时间")
     
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+# ==================== 列表批量校验/序列化 ====================
+
+# 模块级 TypeAdapter：整页数据一次校验（from_attributes）或序列化，避免逐条 model_validate
+USER_INFO_LIST_ADAPTER = TypeAdapter(List[UserInfo])
+USER_BLOCK_INFO_LIST_ADAPTER = TypeAdapter(List[UserBlockInfo])
+BLOGGER_APPLICATION_INFO_LIST_ADAPTER = TypeAdapter(List[BloggerApplicationInfo])
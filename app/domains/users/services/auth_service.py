@@ -1,10 +1,10 @@
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
 
 from app.common.exceptions import BusinessException
+from app.common.security import security_manager
 from app.domains.users.models import User
 from app.domains.users.schemas import UserInfo
 
@@ -12,16 +12,26 @@ from app.domains.users.schemas import UserInfo
 class UserAuthService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        # 复用全局 security_manager 的 CryptContext，bcrypt 计算在线程池中执行
+        return await security_manager.verify_password_async(plain_password, hashed_password)
 
     async def authenticate_user(self, username: str, password: str) -> Optional[UserInfo]:
         user = (await self.db.execute(select(User).where(User.username == username))).scalar_one_or_none()
-        if not user:
+        if not user or not user.password_hash:
+            # 账号不存在或无密码时同样执行一次哈希校验，防止通过响应耗时枚举用户
+            await security_manager.verify_password_async(password, None)
             return None
-        if not self._verify_password(password, user.password_hash):
+        if not await self._verify_password(password, user.password_hash):
             return None
+        await self._upgrade_password_hash(user, password)
         return UserInfo.model_validate(user)
 
+    async def _upgrade_password_hash(self, user: User, password: str) -> None:
+        """登录成功后，若哈希轮数低于当前配置则重新加密保存（渐进迁移，由调用方提交）"""
+        if not security_manager.needs_rehash(user.password_hash):
+            return
+        new_hash = await security_manager.hash_password_async(password)
+        await self.db.execute(update(User).where(User.id == user.id).values(password_hash=new_hash))
+
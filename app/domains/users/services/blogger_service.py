@@ -1,18 +1,28 @@
 """
 博主申请服务
 """
+from datetime import datetime
 from typing import Optional, Dict
-from sqlalchemy import select, insert, update, and_
+from sqlalchemy import select, insert, update, and_, exists
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.common.cache_service import cache_service
 from app.common.exceptions import BusinessException
 from app.domains.users.models import BloggerApplication, User, UserRole, Role
-from app.domains.users.schemas import BloggerApplicationInfo
+from app.domains.users.schemas import BloggerApplicationInfo, BLOGGER_APPLICATION_INFO_LIST_ADAPTER
+
+
+# 博主角色ID缓存（角色ID创建后不会变化，进程内首次查询后复用）
+_blogger_role_id: Optional[int] = None
 
 
 class BloggerService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        # 请求内 is_blogger 缓存，避免同一请求重复执行角色连表查询
+        self._blogger_cache: Dict[int, bool] = {}
 
     async def apply_for_blogger(self, user_id: int) -> BloggerApplicationInfo:
         """申请博主权限"""
@@ -34,15 +44,25 @@ class BloggerService:
                 elif existing_application.status == "APPROVED":
                     raise BusinessException("您的博主申请已通过，无需重复申请")
                 elif existing_application.status == "REJECTED":
-                    # 如果被拒绝，可以重新申请
-                    await self.db.execute(
+                    # 如果被拒绝，可以重新申请（条件更新防止并发重复提交，无需再 refresh 回读）
+                    now = datetime.now()
+                    result = await self.db.execute(
                         update(BloggerApplication)
-                        .where(BloggerApplication.id == existing_application.id)
-                        .values(status="PENDING")
+                        .where(
+                            and_(
+                                BloggerApplication.id == existing_application.id,
+                                BloggerApplication.status == "REJECTED"
+                            )
+                        )
+                        .values(status="PENDING", update_time=now)
+                        .execution_options(synchronize_session=False)
                     )
+                    if result.rowcount == 0:
+                        raise BusinessException("您已有待审核的博主申请，请耐心等待")
                     await self.db.commit()
-                    await self.db.refresh(existing_application)
-                    return BloggerApplicationInfo.model_validate(existing_application)
+                    return BloggerApplicationInfo.model_validate(existing_application).model_copy(
+                        update={"status": "PENDING", "update_time": now}
+                    )
             
             # 创建新的申请
             application = BloggerApplication(user_id=user_id, status="PENDING")
@@ -72,21 +92,28 @@ class BloggerService:
 
     async def check_blogger_status(self, user_id: int) -> Dict:
         """检查博主状态"""
-        # 检查是否已经是博主
-        is_blogger = await self._check_blogger_status(user_id)
-        
-        # 获取申请状态
-        application = await self.db.execute(
-            select(BloggerApplication).where(BloggerApplication.user_id == user_id)
+        # 一次查询同时获取是否为博主与申请状态
+        is_blogger_expr = exists().where(
+            and_(
+                UserRole.user_id == user_id,
+                UserRole.role_id == Role.id,
+                Role.name == "blogger"
+            )
         )
-        application = application.scalar_one_or_none()
-        
-        application_status = None
-        if application:
-            application_status = application.status
+        application_status_expr = (
+            select(BloggerApplication.status)
+            .where(BloggerApplication.user_id == user_id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        row = (await self.db.execute(
+            select(is_blogger_expr.label("is_blogger"), application_status_expr.label("application_status"))
+        )).one()
+        is_blogger = bool(row.is_blogger)
+        application_status = row.application_status
         
         # 判断是否可以申请
-        can_apply = not is_blogger and (not application or application.status == "REJECTED")
+        can_apply = not is_blogger and application_status in (None, "REJECTED")
         
         return {
             "is_blogger": is_blogger,
@@ -95,15 +122,40 @@ class BloggerService:
         }
 
     async def _check_blogger_status(self, user_id: int) -> bool:
-        """检查用户是否已经是博主"""
-        stmt = (
-            select(Role.name)
-            .join(UserRole, Role.id == UserRole.role_id)
-            .where(UserRole.user_id == user_id)
+        """检查用户是否已经是博主（请求内缓存 + Redis 缓存）"""
+        if user_id in self._blogger_cache:
+            return self._blogger_cache[user_id]
+        cache_key = f"user:is_blogger:{user_id}"
+        cached = await cache_service.get(cache_key)
+        if cached is not None:
+            self._blogger_cache[user_id] = cached
+            return cached
+
+        stmt = select(
+            exists().where(
+                and_(
+                    UserRole.user_id == user_id,
+                    UserRole.role_id == Role.id,
+                    Role.name == "blogger"
+                )
+            )
         )
-        result = await self.db.execute(stmt)
-        roles = [row[0] for row in result.all()]
-        return "blogger" in roles
+        is_blogger = bool((await self.db.execute(stmt)).scalar())
+        self._blogger_cache[user_id] = is_blogger
+        await cache_service.set(cache_key, is_blogger, ttl=300)
+        return is_blogger
+
+    async def _get_blogger_role_id(self) -> int:
+        """获取博主角色ID（进程内缓存）"""
+        global _blogger_role_id
+        if _blogger_role_id is None:
+            role_id = (await self.db.execute(
+                select(Role.id).where(Role.name == "blogger")
+            )).scalar_one_or_none()
+            if role_id is None:
+                raise BusinessException("博主角色不存在，请联系管理员")
+            _blogger_role_id = role_id
+        return _blogger_role_id
 
     async def approve_blogger_application(self, application_id: int, admin_user_id: int) -> BloggerApplicationInfo:
         """管理员批准博主申请"""
@@ -127,34 +179,21 @@ class BloggerService:
                 .values(status="APPROVED")
             )
             
-            # 获取博主角色ID
-            blogger_role = await self.db.execute(
-                select(Role).where(Role.name == "blogger")
-            )
-            blogger_role = blogger_role.scalar_one_or_none()
-            
-            if not blogger_role:
-                raise BusinessException("博主角色不存在，请联系管理员")
-            
-            # 检查是否已经有博主角色
-            existing_role = await self.db.execute(
-                select(UserRole).where(
-                    and_(UserRole.user_id == application.user_id, UserRole.role_id == blogger_role.id)
-                )
+            # 添加博主角色（uk_user_role 唯一索引保证已有角色时不重复插入）
+            blogger_role_id = await self._get_blogger_role_id()
+            await self.db.execute(
+                mysql_insert(UserRole)
+                .values(user_id=application.user_id, role_id=blogger_role_id)
+                .prefix_with("IGNORE")
             )
-            existing_role = existing_role.scalar_one_or_none()
-            
-            if not existing_role:
-                # 添加博主角色
-                user_role = UserRole(
-                    user_id=application.user_id,
-                    role_id=blogger_role.id
-                )
-                self.db.add(user_role)
             
             await self.db.commit()
             await self.db.refresh(application)
             
+            # 角色变更后清除 is_blogger 缓存
+            self._blogger_cache.pop(application.user_id, None)
+            await cache_service.delete(f"user:is_blogger:{application.user_id}")
+            
             return BloggerApplicationInfo.model_validate(application)
             
         except BusinessException:
@@ -198,10 +237,12 @@ class BloggerService:
 
     async def get_pending_applications(self, limit: int = 20) -> list[BloggerApplicationInfo]:
         """获取待审核的申请列表"""
+        # BloggerApplicationInfo 仅使用申请表自身字段；raiseload 防止后续新增关联时出现逐行懒加载（N+1）
         applications = await self.db.execute(
             select(BloggerApplication)
+            .options(raiseload("*"))
             .where(BloggerApplication.status == "PENDING")
             .order_by(BloggerApplication.create_time.asc())
             .limit(limit)
         )
-        return [BloggerApplicationInfo.model_validate(app) for app in applications.scalars().all()] 
\ No newline at end of file
+        return BLOGGER_APPLICATION_INFO_LIST_ADAPTER.validate_python(applications.scalars().all(), from_attributes=True) 
\ No newline at end of file
@@ -3,10 +3,12 @@
 处理内容购买、社交动态购买等金币消费业务
 """
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from sqlalchemy import select, and_, update
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy import select, and_, update, lambda_stmt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.common.cache_service import cache_service
 from app.common.exceptions import BusinessException
 from app.domains.users.models import UserWallet
 from app.domains.content.models import UserContentPurchase, Content
@@ -35,55 +37,37 @@ class CoinPurchaseService:
             Dict: 购买结果
         """
         try:
-            # 检查用户钱包余额
-            wallet = await self._get_user_wallet(user_id)
-            if wallet.coin_balance < coin_cost:
-                raise BusinessException("金币余额不足")
+            # 内容冗余信息走缓存；是否已购买由唯一键在写入时判定，无需预先查询
+            content_meta = await self._get_content_meta(content_id)
             
-            # 获取内容信息
-            content = await self._get_content_by_id(content_id)
-            if not content:
-                raise BusinessException("内容不存在")
-            
-            # 检查是否已经购买过
-            existing_purchase = await self._check_content_purchase(user_id, content_id)
-            if existing_purchase:
+            # 先写入购买记录：依赖 uk_user_content 唯一键，并发重复购买时只有一个请求能写入
+            purchase_id, created = await self._claim_content_purchase(user_id, content_id, content_meta, coin_cost)
+            if not created:
                 return {
                     "success": True,
                     "message": "您已购买过此内容",
-                    "purchase_id": existing_purchase.id
+                    "purchase_id": purchase_id
                 }
             
-            # 扣除金币
+            # 扣除金币（条件更新同时完成余额校验；失败时未提交的购买记录随会话回滚）
             await self._deduct_coins(user_id, coin_cost)
-            
-            # 创建购买记录
-            purchase_record = UserContentPurchase(
-                user_id=user_id,
-                content_id=content_id,
-                content_title=content.title,
-                content_type=content.content_type,
-                content_cover_url=content.cover_url,
-                author_id=content.author_id,
-                author_nickname=content.author_nickname,
-                coin_amount=coin_cost,
-                status="ACTIVE",
-                expire_time=None  # 内容购买默认永久有效
-            )
-            
-            self.db.add(purchase_record)
             await self.db.commit()
             
-            logger.info(f"用户 {user_id} 购买内容成功: {content.title}, 消耗金币: {coin_cost}")
+            # 余额已变更，提交后清除钱包缓存，避免继续返回扣款前的余额
+            await cache_service.delete(f"user:wallet:{user_id}")
+            
+            logger.info(f"用户 {user_id} 购买内容成功: {content_meta['content_title']}, 消耗金币: {coin_cost}")
             
             return {
                 "success": True,
                 "message": "购买成功",
-                "purchase_id": purchase_record.id,
-                "content_title": content.title,
+                "purchase_id": purchase_id,
+                "content_title": content_meta["content_title"],
                 "coin_cost": coin_cost
             }
             
+        except BusinessException:
+            raise
         except Exception as e:
             logger.error(f"购买内容失败: {str(e)}", exc_info=True)
             raise
@@ -101,49 +85,48 @@ class CoinPurchaseService:
             Dict: 购买结果
         """
         try:
-            # 检查用户钱包余额
-            wallet = await self._get_user_wallet(user_id)
-            if wallet.coin_balance < coin_cost:
-                raise BusinessException("金币余额不足")
+            # 付费动态是否在售在购买事务内查询（下架只改 is_active，不缓存以免下架后仍可购买）；
+            # 是否已购买由唯一键在写入时判定，无需预先查询
+            await self._ensure_paid_dynamic(dynamic_id)
             
-            # 获取付费动态信息
-            paid_dynamic = await self._get_paid_dynamic_by_id(dynamic_id)
-            if not paid_dynamic:
-                raise BusinessException("付费动态不存在")
-            
-            # 检查是否已经购买过
-            existing_purchase = await self._check_dynamic_purchase(user_id, dynamic_id)
-            if existing_purchase:
+            # 先写入购买记录：依赖 uk_dynamic_buyer 唯一键，并发重复购买时只有一个请求能写入
+            purchase = SocialDynamicPurchase(
+                dynamic_id=dynamic_id, buyer_id=user_id, price=coin_cost, purchase_time=datetime.now()
+            )
+            if not await self._insert_unique(purchase, "uk_dynamic_buyer"):
+                purchase_id = (await self.db.execute(
+                    select(SocialDynamicPurchase.id).where(
+                        and_(
+                            SocialDynamicPurchase.buyer_id == user_id,
+                            SocialDynamicPurchase.dynamic_id == dynamic_id
+                        )
+                    )
+                )).scalar_one()
                 return {
                     "success": True,
                     "message": "您已购买过此动态",
-                    "purchase_id": existing_purchase.id
+                    "purchase_id": purchase_id
                 }
+            purchase_id = purchase.id
             
-            # 扣除金币
+            # 扣除金币（条件更新同时完成余额校验；失败时未提交的购买记录随会话回滚）
             await self._deduct_coins(user_id, coin_cost)
-            
-            # 创建购买记录
-            purchase_record = SocialDynamicPurchase(
-                user_id=user_id,
-                dynamic_id=dynamic_id,
-                coin_amount=coin_cost,
-                status="ACTIVE",
-                purchase_time=datetime.now()
-            )
-            
-            self.db.add(purchase_record)
             await self.db.commit()
             
+            # 余额已变更，提交后清除钱包缓存，避免继续返回扣款前的余额
+            await cache_service.delete(f"user:wallet:{user_id}")
+            
             logger.info(f"用户 {user_id} 购买动态成功: 动态ID {dynamic_id}, 消耗金币: {coin_cost}")
             
             return {
                 "success": True,
                 "message": "购买成功",
-                "purchase_id": purchase_record.id,
+                "purchase_id": purchase_id,
                 "coin_cost": coin_cost
             }
             
+        except BusinessException:
+            raise
         except Exception as e:
             logger.error(f"购买动态失败: {str(e)}", exc_info=True)
             raise
@@ -165,8 +148,7 @@ class CoinPurchaseService:
                 "has_purchased": True,
                 "purchase_time": purchase.purchase_time,
                 "expire_time": purchase.expire_time,
-                "is_valid": purchase.status == "ACTIVE" and 
-                           (purchase.expire_time is None or purchase.expire_time > datetime.now())
+                "is_valid": purchase.expire_time is None or purchase.expire_time > datetime.now()
             }
         else:
             return {
@@ -192,7 +174,7 @@ class CoinPurchaseService:
             return {
                 "has_purchased": True,
                 "purchase_time": purchase.purchase_time,
-                "is_valid": purchase.status == "ACTIVE"
+                "is_valid": True
             }
         else:
             return {
@@ -224,7 +206,7 @@ class CoinPurchaseService:
         elif purchase_type == "dynamic":
             result = await self.db.execute(
                 select(SocialDynamicPurchase)
-                .where(SocialDynamicPurchase.user_id == user_id)
+                .where(SocialDynamicPurchase.buyer_id == user_id)
                 .order_by(SocialDynamicPurchase.purchase_time.desc())
                 .limit(limit)
             )
@@ -232,78 +214,135 @@ class CoinPurchaseService:
         else:
             raise BusinessException("不支持的购买类型")
     
-    async def _get_user_wallet(self, user_id: int) -> UserWallet:
-        """获取用户钱包"""
-        result = await self.db.execute(
-            select(UserWallet).where(UserWallet.user_id == user_id)
-        )
-        wallet = result.scalar_one_or_none()
+    async def _get_content_meta(self, content_id: int) -> Dict[str, Any]:
+        """获取购买记录所需的内容冗余字段（几乎不变，缓存1小时；内容更新时随 content:* 一并清除）"""
+        cache_key = f"content:purchase_meta:{content_id}"
+        content_meta = await cache_service.get(cache_key)
+        if content_meta:
+            return content_meta
         
-        if not wallet:
-            # 如果钱包不存在，创建一个
-            wallet = UserWallet(
-                user_id=user_id,
-                balance=0.00,
-                frozen_amount=0.00,
-                coin_balance=0,
-                coin_total_earned=0,
-                coin_total_spent=0,
-                total_income=0.00,
-                total_expense=0.00,
-                status="active"
-            )
-            self.db.add(wallet)
-            await self.db.flush()
+        row = (await self.db.execute(
+            select(
+                Content.title.label("content_title"),
+                Content.content_type,
+                Content.cover_url.label("content_cover_url"),
+                Content.author_id,
+                Content.author_nickname
+            ).where(Content.id == content_id)
+        )).first()
+        if not row:
+            raise BusinessException("内容不存在")
+        content_meta = dict(row._mapping)
+        await cache_service.set(cache_key, content_meta, ttl=3600)
+        return content_meta
+    
+    async def _ensure_paid_dynamic(self, dynamic_id: int) -> None:
+        """确认付费动态存在且未下架"""
+        paid_dynamic_id = (await self.db.execute(
+            select(SocialPaidDynamic.id).where(
+                and_(SocialPaidDynamic.dynamic_id == dynamic_id, SocialPaidDynamic.is_active == True)
+            ).limit(1)
+        )).scalar_one_or_none()
+        if paid_dynamic_id is None:
+            raise BusinessException("付费动态不存在或已下架")
+    
+    async def _claim_content_purchase(
+        self, user_id: int, content_id: int, content_meta: Dict[str, Any], coin_cost: int
+    ) -> Tuple[int, bool]:
+        """
+        写入内容购买记录（uk_user_content 唯一键防重复购买）
+        
+        Returns:
+            Tuple[int, bool]: (购买记录ID, 是否由本次请求新写入/重新激活)
+        """
+        values = dict(
+            user_id=user_id,
+            content_id=content_id,
+            **content_meta,
+            coin_amount=coin_cost,
+            status="ACTIVE",
+            expire_time=None  # 内容购买默认永久有效
+        )
+        purchase = UserContentPurchase(**values)
+        if await self._insert_unique(purchase, "uk_user_content"):
+            return purchase.id, True
         
-        return wallet
+        # 唯一键冲突：已退款/过期的记录重新激活；记录仍有效说明并发请求已完成购买
+        purchase_condition = and_(
+            UserContentPurchase.user_id == user_id,
+            UserContentPurchase.content_id == content_id
+        )
+        result = await self.db.execute(
+            update(UserContentPurchase)
+            .where(and_(purchase_condition, UserContentPurchase.status != "ACTIVE"))
+            .values(**values, purchase_time=datetime.now())
+        )
+        purchase_id = (await self.db.execute(
+            select(UserContentPurchase.id).where(purchase_condition)
+        )).scalar_one()
+        return purchase_id, result.rowcount > 0
+    
+    async def _insert_unique(self, record, unique_key: str) -> bool:
+        """
+        在保存点内写入记录，命中指定唯一键时回滚保存点并返回 False；
+        其他完整性错误照常抛出（INSERT IGNORE 会把它们一并降级为警告）
+        """
+        try:
+            async with self.db.begin_nested():
+                self.db.add(record)
+                await self.db.flush()
+            return True
+        except IntegrityError as e:
+            if unique_key not in str(e.orig):
+                raise
+            return False
     
     async def _deduct_coins(self, user_id: int, coin_amount: int):
-        """扣除用户金币"""
-        await self.db.execute(
+        """扣除用户金币（单条条件更新，余额不足时不扣减，避免并发超扣）"""
+        result = await self.db.execute(
             update(UserWallet)
-            .where(UserWallet.user_id == user_id)
+            .where(
+                and_(
+                    UserWallet.user_id == user_id,
+                    UserWallet.coin_balance >= coin_amount
+                )
+            )
             .values(
                 coin_balance=UserWallet.coin_balance - coin_amount,
                 coin_total_spent=UserWallet.coin_total_spent + coin_amount
             )
         )
-    
-    async def _get_content_by_id(self, content_id: int) -> Optional[Content]:
-        """根据ID获取内容"""
-        result = await self.db.execute(
-            select(Content).where(Content.id == content_id)
-        )
-        return result.scalar_one_or_none()
-    
-    async def _get_paid_dynamic_by_id(self, dynamic_id: int) -> Optional[SocialPaidDynamic]:
-        """根据ID获取付费动态"""
-        result = await self.db.execute(
-            select(SocialPaidDynamic).where(SocialPaidDynamic.dynamic_id == dynamic_id)
-        )
-        return result.scalar_one_or_none()
+        if result.rowcount == 0:
+            # 未更新到行时再查询一次，区分钱包不存在与余额不足
+            wallet_id = (await self.db.execute(
+                select(UserWallet.id).where(UserWallet.user_id == user_id)
+            )).scalar_one_or_none()
+            if wallet_id is None:
+                raise BusinessException("用户钱包不存在")
+            raise BusinessException("金币余额不足")
     
     async def _check_content_purchase(self, user_id: int, content_id: int):
-        """检查内容购买记录"""
-        result = await self.db.execute(
-            select(UserContentPurchase).where(
+        """检查内容购买记录（仅查询状态接口需要的时间字段，不加载整行）"""
+        # 状态查询频繁，用 lambda_stmt 复用已构造的语句，参数从闭包变量绑定
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(UserContentPurchase.purchase_time, UserContentPurchase.expire_time).where(
                 and_(
                     UserContentPurchase.user_id == user_id,
                     UserContentPurchase.content_id == content_id,
                     UserContentPurchase.status == "ACTIVE"
                 )
             )
-        )
-        return result.scalar_one_or_none()
+        ))
+        return result.first()
     
     async def _check_dynamic_purchase(self, user_id: int, dynamic_id: int):
-        """检查动态购买记录"""
-        result = await self.db.execute(
-            select(SocialDynamicPurchase).where(
+        """检查动态购买记录（仅查询购买时间）"""
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(SocialDynamicPurchase.purchase_time).where(
                 and_(
-                    SocialDynamicPurchase.user_id == user_id,
-                    SocialDynamicPurchase.dynamic_id == dynamic_id,
-                    SocialDynamicPurchase.status == "ACTIVE"
+                    SocialDynamicPurchase.buyer_id == user_id,
+                    SocialDynamicPurchase.dynamic_id == dynamic_id
                 )
             )
-        )
-        return result.scalar_one_or_none() 
\ No newline at end of file
+        ))
+        return result.first()
@@ -1,14 +1,17 @@
+from datetime import datetime
 from typing import Optional
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import select, update, delete, and_, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.common.cache_service import cache_service
+from app.common.atomic import invalidate_after_commit
 from app.common.exceptions import BusinessException
 from app.domains.users.models import User, UserBlock
 from app.domains.users.schemas import UserInfo, UserUpdate
 
 
 class UserProfileService:
+    """用户资料与拉黑服务（由门面 @atomic_transaction 统一提交事务，此处不单独 commit）"""
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -18,15 +21,14 @@ class UserProfileService:
             raise BusinessException("用户不存在")
 
         update_data = {}
-        from sqlalchemy import and_
         if req.username is not None:
-            existing_user = (await self.db.execute(select(User).where(and_(User.username == req.username, User.id != user_id)))).scalar_one_or_none()
-            if existing_user:
+            username_taken = (await self.db.execute(select(exists().where(and_(User.username == req.username, User.id != user_id))))).scalar()
+            if username_taken:
                 raise BusinessException("用户名已被使用")
             update_data["username"] = req.username
         if req.email is not None:
-            existing_email = (await self.db.execute(select(User).where(and_(User.email == req.email, User.id != user_id)))).scalar_one_or_none()
-            if existing_email:
+            email_taken = (await self.db.execute(select(exists().where(and_(User.email == req.email, User.id != user_id))))).scalar()
+            if email_taken:
                 raise BusinessException("邮箱已被使用")
             update_data["email"] = req.email
         if req.nickname is not None:
@@ -38,18 +40,17 @@ class UserProfileService:
         if req.status is not None:
             update_data["status"] = req.status
 
+        old_username = user.username
         if update_data:
+            # 显式写入 update_time，使会话内的 user 对象随 UPDATE 同步且不被过期，可直接用于返回，无需再查询一次
+            update_data["update_time"] = datetime.now()
             await self.db.execute(update(User).where(User.id == user_id).values(**update_data))
-            await self.db.commit()
-
-        await cache_service.delete_user_cache(user_id)
-        await cache_service.delete_pattern("user:username:*")
-        return await self._get_user_info(user_id)
 
-    async def _get_user_info(self, user_id: int) -> UserInfo:
-        user = (await self.db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-        if not user:
-            raise BusinessException("用户不存在")
+        # 按确定的键失效（事务提交后执行）：原用户名的缓存，以及新用户名可能残留的空值缓存
+        stale_keys = [f"user:{user_id}", f"user:username:{old_username}"]
+        if req.username is not None and req.username != old_username:
+            stale_keys.append(f"user:username:{req.username}")
+        invalidate_after_commit(self.db, *stale_keys)
         return UserInfo.model_validate(user)
 
     async def block_user(self, user_id: int, blocked_user_id: int, reason: Optional[str] = None):
@@ -59,8 +60,8 @@ class UserProfileService:
             raise BusinessException("用户不存在")
         if user_id == blocked_user_id:
             raise BusinessException("不能拉黑自己")
-        existing_block = (await self.db.execute(select(UserBlock).where(and_(UserBlock.user_id == user_id, UserBlock.blocked_user_id == blocked_user_id)))).scalar_one_or_none()
-        if existing_block:
+        already_blocked = (await self.db.execute(select(exists().where(and_(UserBlock.user_id == user_id, UserBlock.blocked_user_id == blocked_user_id))))).scalar()
+        if already_blocked:
             raise BusinessException("已经拉黑该用户")
         record = UserBlock(
             user_id=user_id,
@@ -71,8 +72,9 @@ class UserProfileService:
             reason=reason,
         )
         self.db.add(record)
-        await self.db.commit()
-        await cache_service.delete_pattern("user:block:*")
+        await self.db.flush()
+        await self.db.refresh(record)
+        invalidate_after_commit(self.db, f"user:block:count:{user_id}")
         from app.domains.users.schemas import UserBlockInfo
         return UserBlockInfo.model_validate(record)
 
@@ -81,7 +83,6 @@ class UserProfileService:
         if not block_record:
             raise BusinessException("未找到拉黑记录")
         await self.db.execute(delete(UserBlock).where(UserBlock.id == block_record.id))
-        await self.db.commit()
-        await cache_service.delete_pattern("user:block:*")
+        invalidate_after_commit(self.db, f"user:block:count:{user_id}")
         return True
 
@@ -1,13 +1,54 @@
+import logging
+import re
+import time
 from typing import Optional, Dict
 
-from sqlalchemy import select, and_, or_, func
+from pydantic import ValidationError
+from sqlalchemy import select, and_, or_, func, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.common.cache_service import cache_service
+from app.common.cache_service import cache_service, CACHE_MISSING, CACHE_MISSING_TTL
 from app.common.exceptions import BusinessException
-from app.common.pagination import PaginationParams, PaginationResult
+from app.common.pagination import PaginationParams, PaginationResult, keyset_condition
 from app.domains.users.models import User, Role, UserRole
-from app.domains.users.schemas import UserInfo, UserQuery
+from app.domains.users.schemas import UserInfo, UserQuery, USER_INFO_LIST_ADAPTER
+
+
+logger = logging.getLogger(__name__)
+
+# 全文检索布尔模式下的操作符，拼接前需剔除，避免用户输入改变查询语义
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+# 用户列表缓存键（含总数缓存）登记的标签，新增用户时按标签整体失效
+USER_LIST_CACHE_TAG = "tag:user:list"
+
+# ft_user_search 使用 ngram 分词（默认 ngram_token_size=2），短于该长度的词无法命中索引
+_NGRAM_TOKEN_SIZE = 2
+
+# MySQL ER_FT_MATCHING_KEY_NOT_FOUND：找不到与列匹配的全文索引
+_ER_FT_MATCHING_KEY_NOT_FOUND = 1191
+
+# ft_user_search 索引缺失时降级为 LIKE 查询的时长（秒），到期后重新尝试全文检索
+FULLTEXT_RETRY_INTERVAL = 300
+
+# 全文检索暂停至该时间点（time.monotonic）
+_fulltext_disabled_until = 0.0
+
+
+def _fulltext_keyword(keyword: str) -> str:
+    """将关键词转换为 BOOLEAN MODE 前缀匹配表达式；含过短词时返回空串，由调用方走 LIKE 查询"""
+    terms = _FULLTEXT_OPERATORS.sub(" ", keyword).split()
+    if not terms or any(len(term) < _NGRAM_TOKEN_SIZE for term in terms):
+        return ""
+    return " ".join(f"+{term}*" for term in terms)
+
+
+def _is_fulltext_index_missing(error: DBAPIError) -> bool:
+    """判断数据库异常是否为全文索引缺失"""
+    args = getattr(error.orig, "args", None)
+    return bool(args) and args[0] == _ER_FT_MATCHING_KEY_NOT_FOUND
 
 
 class UserQueryService:
@@ -15,57 +56,82 @@ class UserQueryService:
         self.db = db
 
     async def get_user_by_id(self, user_id: int) -> UserInfo:
-        cached_user = await cache_service.get_user_cache(user_id)
-        if cached_user:
-            return UserInfo.model_validate(cached_user)
-        user = (await self.db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
-        if not user:
-            raise BusinessException("用户不存在")
-        # 查询角色列表
-        roles_stmt = (
-            select(Role.name)
-            .join(UserRole, Role.id == UserRole.role_id)
-            .where(UserRole.user_id == user.id)
-        )
-        roles_result = await self.db.execute(roles_stmt)
-        roles = [row[0] for row in roles_result.all()] or ["user"]
-        user_dict = UserInfo.model_validate(user).model_dump()
-        user_dict["roles"] = roles
-        user_info = UserInfo(**user_dict)
-        await cache_service.set_user_cache(user_id, user_info.model_dump())
-        return user_info
+        return await self._get_user(f"user:{user_id}", User.id == user_id)
 
     async def get_user_by_username(self, username: str) -> UserInfo:
-        cache_key = f"user:username:{username}"
-        cached_user = await cache_service.get(cache_key)
+        return await self._get_user(f"user:username:{username}", User.username == username)
+
+    async def _get_user(self, cache_key: str, condition) -> UserInfo:
+        """查询单个用户；缓存存放 model_dump_json 串，命中时由 model_validate_json 一次完成解析与校验"""
+        cached_user = await cache_service.get_raw(cache_key)
+        if cached_user == CACHE_MISSING:
+            raise BusinessException("用户不存在")
         if cached_user:
-            return UserInfo.model_validate(cached_user)
-        user = (await self.db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+            try:
+                return UserInfo.model_validate_json(cached_user)
+            except ValidationError:
+                # 旧格式缓存无法解析时回源重建
+                pass
+        # 用户与角色通过 LEFT JOIN 一次查出
+        stmt = select(User).options(joinedload(User.role_entities)).where(condition)
+        user = (await self.db.execute(stmt)).unique().scalar_one_or_none()
         if not user:
+            await cache_service.set_raw(cache_key, CACHE_MISSING, ttl=CACHE_MISSING_TTL)
             raise BusinessException("用户不存在")
-        # 查询角色列表
-        roles_stmt = (
-            select(Role.name)
-            .join(UserRole, Role.id == UserRole.role_id)
-            .where(UserRole.user_id == user.id)
-        )
-        roles_result = await self.db.execute(roles_stmt)
-        roles = [row[0] for row in roles_result.all()] or ["user"]
-        user_dict = UserInfo.model_validate(user).model_dump()
-        user_dict["roles"] = roles
-        user_info = UserInfo(**user_dict)
-        await cache_service.set(cache_key, user_info.model_dump(), ttl=3600)
+        user_info = self._to_user_info(user)
+        await cache_service.set_raw(cache_key, user_info.model_dump_json(), ttl=3600)
         return user_info
 
     async def get_user_list(self, query: UserQuery, pagination: PaginationParams) -> PaginationResult[UserInfo]:
-        cache_key = f"user:list:{hash(str(query.model_dump()) + str(pagination.model_dump()))}"
-        cached_result = await cache_service.get(cache_key)
+        cache_key = f"user:list:{cache_service.query_digest(query, pagination)}"
+        count_key = None
+        cached_total = None
+        if pagination.is_keyset:
+            # 游标分页同时需要页缓存与总数缓存，一次 MGET 读取
+            count_key = f"user:list:count:{cache_service.query_digest(query)}"
+            cached_result, cached_total = await cache_service.mget(cache_key, count_key)
+        else:
+            cached_result = await cache_service.get(cache_key)
         if cached_result:
-            return PaginationResult.model_validate(cached_result)
+            # 按 UserInfo 重新校验，命中时与回源时输出相同的日期时间格式
+            return PaginationResult[UserInfo].model_validate(cached_result)
+
+        global _fulltext_disabled_until
+        keyword = query.username if query.username and query.username == query.nickname else None
+        fulltext_keyword = ""
+        if keyword and time.monotonic() >= _fulltext_disabled_until:
+            fulltext_keyword = _fulltext_keyword(keyword)
+        if fulltext_keyword:
+            try:
+                # 全文检索在保存点内执行，失败时只回滚保存点，不影响调用方会话中的其他改动
+                async with self.db.begin_nested():
+                    return await self._query_user_list(
+                        query, pagination, cache_key, keyword, fulltext_keyword, count_key, cached_total
+                    )
+            except DBAPIError as e:
+                if not _is_fulltext_index_missing(e):
+                    raise
+                # 全文索引不存在（如迁移期间）时暂时降级为 LIKE
+                logger.warning(f"用户全文检索不可用，{FULLTEXT_RETRY_INTERVAL}秒内降级为LIKE查询: {str(e)}")
+                _fulltext_disabled_until = time.monotonic() + FULLTEXT_RETRY_INTERVAL
+        return await self._query_user_list(query, pagination, cache_key, keyword, "", count_key, cached_total)
 
+    async def _query_user_list(
+        self,
+        query: UserQuery,
+        pagination: PaginationParams,
+        cache_key: str,
+        keyword: Optional[str],
+        fulltext_keyword: str,
+        count_key: Optional[str] = None,
+        cached_total: Optional[int] = None,
+    ) -> PaginationResult[UserInfo]:
         conditions = []
-        if query.username and query.nickname and query.username == query.nickname:
-            keyword = query.username
+        if fulltext_keyword:
+            conditions.append(
+                text("MATCH(username, nickname) AGAINST (:kw IN BOOLEAN MODE)").bindparams(kw=fulltext_keyword)
+            )
+        elif keyword:
             conditions.append(or_(User.username.contains(keyword), User.nickname.contains(keyword)))
         else:
             if query.username:
@@ -99,36 +165,54 @@ class UserQueryService:
         stmt = select(User)
         if conditions:
             stmt = stmt.where(and_(*conditions))
-        stmt = stmt.order_by(User.create_time.desc())
+        order_by = (User.create_time.desc(), User.id.desc())
 
-        total_stmt = select(func.count()).select_from(stmt.subquery())
-        total_result = await self.db.execute(total_stmt)
-        total = total_result.scalar()
-
-        result = await self.db.execute(stmt.offset(pagination.offset).limit(pagination.limit))
-        users = result.scalars().all()
-
-        # 批量查询角色，减少N+1
-        if users:
-            user_ids = [u.id for u in users]
-            roles_stmt = (
-                select(UserRole.user_id, Role.name)
-                .join(Role, Role.id == UserRole.role_id)
-                .where(UserRole.user_id.in_(user_ids))
+        has_next = None
+        if pagination.is_keyset:
+            # 游标分页：不做 OFFSET 扫描，总数走短期缓存，多取一条判断是否还有下一页
+            total = cached_total if cached_total is not None else await self._count_and_cache(count_key, stmt)
+            page_stmt = (
+                stmt.where(keyset_condition(User.create_time, User.id, pagination))
+                .options(selectinload(User.role_entities))
+                .order_by(*order_by)
+                .limit(pagination.limit + 1)
             )
-            roles_result = await self.db.execute(roles_stmt)
-            user_id_to_roles = {}
-            for uid, role_name in roles_result.all():
-                user_id_to_roles.setdefault(uid, []).append(role_name)
+            users = (await self.db.execute(page_stmt)).scalars().all()
+            has_next = len(users) > pagination.limit
+            users = users[:pagination.limit]
         else:
-            user_id_to_roles = {}
-
-        items = []
-        for u in users:
-            user_dict = UserInfo.model_validate(u).model_dump()
-            user_dict["roles"] = user_id_to_roles.get(u.id, ["user"]) or ["user"]
-            items.append(UserInfo(**user_dict))
-        pagination_result = PaginationResult.create(items=items, total=total, page=pagination.page, page_size=pagination.page_size)
-        await cache_service.set(cache_key, pagination_result.model_dump(), ttl=300)
+            # 窗口函数在同一查询中返回总数，省去单独的 COUNT 子查询往返
+            page_stmt = (
+                stmt.add_columns(func.count().over().label("total"))
+                .options(selectinload(User.role_entities))
+                .order_by(*order_by)
+                .offset(pagination.offset)
+                .limit(pagination.limit)
+            )
+            rows = (await self.db.execute(page_stmt)).all()
+            users = [row[0] for row in rows]
+            if rows:
+                total = rows[0].total
+            else:
+                # 当前页为空（如页码越界）时无法从结果行获得总数，回退为 COUNT 查询
+                total = (await self.db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+
+        items = USER_INFO_LIST_ADAPTER.validate_python(users, from_attributes=True)
+        for item, user in zip(items, users):
+            item.roles = [role.name for role in user.role_entities] or ["user"]
+        pagination_result = PaginationResult.create(items=items, total=total, page=pagination.page, page_size=pagination.page_size, has_next=has_next)
+        await cache_service.set_tagged(cache_key, pagination_result.model_dump(mode="json"), USER_LIST_CACHE_TAG, ttl=300)
         return pagination_result
 
+    @staticmethod
+    def _to_user_info(user: User) -> UserInfo:
+        """ORM 用户转换为 UserInfo（需已预加载 role_entities）"""
+        user_info = UserInfo.model_validate(user)
+        user_info.roles = [role.name for role in user.role_entities] or ["user"]
+        return user_info
+
+    async def _count_and_cache(self, cache_key: str, stmt) -> int:
+        """统计列表总数并短期缓存（游标分页时避免每页 COUNT 全量扫描）"""
+        total = (await self.db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+        await cache_service.set_tagged(cache_key, total, USER_LIST_CACHE_TAG, ttl=60)
+        return total
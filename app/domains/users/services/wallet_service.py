@@ -1,10 +1,16 @@
-from sqlalchemy import select, update
+from sqlalchemy import select, update, lambda_stmt
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.cache_service import cache_service
+from app.database.connection import AsyncSessionLocal
 from app.domains.users.models import UserWallet
 from app.domains.users.schemas import UserWalletInfo
 
+# 钱包余额随购买频繁变化：软过期后先返回旧值并后台刷新，硬过期兜底
+WALLET_CACHE_SOFT_TTL = 60
+WALLET_CACHE_TTL = 120
+
 
 class UserWalletService:
     def __init__(self, db: AsyncSession):
@@ -12,28 +18,36 @@ class UserWalletService:
 
     async def get_user_wallet(self, user_id: int) -> UserWalletInfo:
         cache_key = f"user:wallet:{user_id}"
-        cached_wallet = await cache_service.get(cache_key)
+        cached_wallet, is_stale = await cache_service.get_swr(cache_key)
         if cached_wallet:
+            if is_stale:
+                await cache_service.refresh_swr(
+                    cache_key, lambda: _load_wallet_payload(user_id), WALLET_CACHE_SOFT_TTL, WALLET_CACHE_TTL
+                )
             return UserWalletInfo.model_validate(cached_wallet)
 
-        wallet = (await self.db.execute(select(UserWallet).where(UserWallet.user_id == user_id))).scalar_one_or_none()
-        if not wallet:
-            wallet = UserWallet(
-                user_id=user_id,
-                balance=0.00,
-                frozen_amount=0.00,
-                coin_balance=0,
-                coin_total_earned=0,
-                coin_total_spent=0,
-                total_income=0.00,
-                total_expense=0.00,
-                status="active",
-            )
-            self.db.add(wallet)
-            await self.db.commit()
-            await self.db.refresh(wallet)
+        # 新建钱包由调用方（@atomic_transaction）提交
+        wallet = await self.get_or_create_wallet(user_id)
 
         wallet_info = UserWalletInfo.model_validate(wallet)
-        await cache_service.set(cache_key, wallet_info.model_dump(), ttl=1800)
+        await cache_service.set_swr(cache_key, wallet_info.model_dump(), WALLET_CACHE_SOFT_TTL, WALLET_CACHE_TTL)
         return wallet_info
 
+    async def get_or_create_wallet(self, user_id: int) -> UserWallet:
+        """获取用户钱包，不存在时以 INSERT IGNORE 自动创建（依赖 uk_user_id，避免并发重复创建）"""
+        # lambda_stmt 按 lambda 代码位置缓存语句结构，热路径上免去每次构造与生成缓存键的开销
+        stmt = lambda_stmt(lambda: select(UserWallet).where(UserWallet.user_id == user_id))
+        wallet = (await self.db.execute(stmt)).scalar_one_or_none()
+        if wallet:
+            return wallet
+
+        await self.db.execute(mysql_insert(UserWallet).values(user_id=user_id).prefix_with("IGNORE"))
+        return (await self.db.execute(stmt)).scalar_one()
+
+
+async def _load_wallet_payload(user_id: int) -> dict:
+    """后台刷新钱包缓存时使用独立会话加载（请求会话此时可能已关闭）"""
+    async with AsyncSessionLocal() as db:
+        wallet = await UserWalletService(db).get_or_create_wallet(user_id)
+        await db.commit()
+        return UserWalletInfo.model_validate(wallet).model_dump()
@@ -2,13 +2,18 @@
 Collide User Service 主应用入口
 微服务架构，支持Nacos服务注册与发现
 """
+import asyncio
+import importlib
 import logging
 import signal
 import sys
 from datetime import datetime
 from contextlib import asynccontextmanager
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.openapi.utils import get_openapi
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -20,27 +25,12 @@ from app.common.exception_handlers import (
     sqlalchemy_exception_handler,
     general_exception_handler
 )
+from app.common.metrics import MetricsMiddleware, metrics_response
 from app.common.nacos_client import nacos_client
 from app.common.redis_client import init_redis, close_redis
-from app.database.connection import engine, Base
-from app.domains.users.async_router import router as users_router
-from app.domains.content.async_router import router as content_router
-from app.domains.category.async_router import router as category_router
-from app.domains.social.async_router import router as social_router
-from app.domains.comment.async_router import router as comment_router
-from app.domains.like.async_router import router as like_router
-from app.domains.follow.async_router import router as follow_router
-from app.domains.favorite.async_router import router as favorite_router
-from app.domains.search.async_router import router as search_router
-from app.domains.tag.async_router import router as tag_router
-from app.domains.ads.async_router import router as ads_router
-from app.domains.message.async_router import router as message_router
-from app.domains.task.async_router import router as task_router
-from app.domains.goods.async_router import router as goods_router
-from app.domains.order.async_router import router as order_router
-from app.domains.payment.async_router import router as payment_router
-from app.domains.storage.async_router import router as storage_router
-from app.domains.interaction.async_router import router as interaction_router
+from app.database.connection import engine, async_engine, Base, warmup_async_pool, check_async_db
+from app.domains.content.async_router import warmup_feed_cache
+from app.domains.payment.services.init_service import close_gateway_client
 
 # 配置日志
 logging.basicConfig(
@@ -50,28 +40,23 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """应用生命周期管理"""
-    # 启动时执行
-    logger.info(f"正在启动 {settings.app_name}...")
-    
-    # 创建数据库表（如果不存在）
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("数据库表检查完成")
-    except Exception as e:
-        logger.error(f"数据库初始化失败: {e}")
-        raise
-    
-    # 初始化Redis连接
+async def _warmup_db_pool() -> None:
+    """预热异步数据库连接池"""
+    warmed = await warmup_async_pool()
+    logger.info(f"数据库连接池预热完成，已建立 {warmed} 个连接")
+
+
+async def _init_redis() -> None:
+    """初始化Redis连接"""
     try:
         await init_redis()
         logger.info("Redis连接初始化成功")
     except Exception as e:
         logger.warning(f"Redis初始化失败: {e}，缓存功能将不可用")
-    
-    # 初始化并注册到Nacos
+
+
+def _register_nacos() -> None:
+    """初始化并注册到Nacos（同步调用，在线程池中执行）"""
     try:
         if nacos_client.init_client():
             if nacos_client.register_service():
@@ -82,27 +67,94 @@ async def lifespan(app: FastAPI):
             logger.warning("Nacos客户端初始化失败，服务将在无服务发现模式下运行")
     except Exception as e:
         logger.warning(f"Nacos配置失败: {e}，服务将在无服务发现模式下运行")
-    
-    yield
-    
-    # 关闭时执行
-    logger.info(f"正在关闭 {settings.app_name}...")
-    
-    # 关闭Redis连接
+
+
+async def _close_redis() -> None:
+    """关闭Redis连接"""
     try:
         await close_redis()
         logger.info("Redis连接已关闭")
     except Exception as e:
         logger.error(f"关闭Redis连接失败: {e}")
-    
-    # 从Nacos注销服务
+
+
+def _deregister_nacos() -> None:
+    """从Nacos注销服务（同步调用，在线程池中执行）"""
     try:
         nacos_client.deregister_service()
         logger.info("Nacos服务注销完成")
     except Exception as e:
         logger.warning(f"Nacos服务注销失败: {e}")
+
+
+# 业务域路由模块（按注册顺序）
+ROUTER_MODULES = (
+    "app.domains.users.async_router",
+    "app.domains.content.async_router",
+    "app.domains.category.async_router",
+    "app.domains.social.async_router",
+    "app.domains.comment.async_router",
+    "app.domains.like.async_router",
+    "app.domains.follow.async_router",
+    "app.domains.favorite.async_router",
+    "app.domains.search.async_router",
+    "app.domains.tag.async_router",
+    "app.domains.ads.async_router",
+    "app.domains.message.async_router",
+    "app.domains.task.async_router",
+    "app.domains.goods.async_router",
+    "app.domains.order.async_router",
+    "app.domains.payment.async_router",
+    "app.domains.storage.async_router",
+    "app.domains.interaction.async_router",
+)
+
+
+def _load_routers(app: FastAPI) -> None:
+    """按 ROUTER_MODULES 导入并注册各业务域路由"""
+    for module_name in ROUTER_MODULES:
+        app.include_router(importlib.import_module(module_name).router)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    # 启动时执行
+    logger.info(f"正在启动 {settings.app_name}...")
+    
+    # 创建数据库表（如果不存在）：每张表都要反射检查，仅在调试或显式开启时执行
+    if settings.debug or settings.db_create_tables:
+        try:
+            Base.metadata.create_all(bind=engine)
+            logger.info("数据库表检查完成")
+        except Exception as e:
+            logger.error(f"数据库初始化失败: {e}")
+            raise
+    
+    # 连接池预热、Redis 初始化与 Nacos 注册互不依赖，并行执行（Nacos SDK 为同步网络调用，放入线程池）
+    await asyncio.gather(_warmup_db_pool(), _init_redis(), asyncio.to_thread(_register_nacos))
+    
+    # 启动时生成 OpenAPI schema，避免首个文档请求遍历全部路由
+    if app.openapi_url:
+        app.openapi()
+    
+    # 后台预热公共榜单缓存，不阻塞启动
+    feed_warmup_task = asyncio.create_task(warmup_feed_cache())
+    
+    yield
+    
+    # 关闭时执行
+    logger.info(f"正在关闭 {settings.app_name}...")
+    feed_warmup_task.cancel()
+    
+    # 关闭Redis连接与Nacos注销并行执行
+    await asyncio.gather(_close_redis(), asyncio.to_thread(_deregister_nacos))
+    
+    # 关闭支付网关 HTTP 连接池
+    await close_gateway_client()
     
     # 关闭数据库连接
+    await async_engine.dispose()
     engine.dispose()
 
 
@@ -166,7 +218,11 @@ app = FastAPI(
     ],
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    # 生产环境不提供文档页面，也不再生成与保留 OpenAPI schema
+    openapi_url="/openapi.json" if settings.debug else None,
     openapi_tags=tags_metadata,
+    # 默认使用 orjson 序列化响应，比标准库 json 更快
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -222,12 +278,25 @@ def custom_openapi():
         })
 
     app.openapi_schema = openapi_schema
+    # 同时缓存序列化结果，/openapi.json 直接返回字节
+    app.state.openapi_bytes = orjson.dumps(openapi_schema)
     return app.openapi_schema
 
 
 # 挂载自定义 OpenAPI 生成函数
 app.openapi = custom_openapi  # type: ignore
 
+if app.openapi_url:
+    # 替换默认的 /openapi.json 路由：默认实现每次请求都会重新编码整个 schema
+    app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url]
+
+    @app.get(app.openapi_url, include_in_schema=False)
+    async def openapi_json():
+        """返回预序列化的 OpenAPI 文档"""
+        app.openapi()
+        return Response(app.state.openapi_bytes, media_type="application/json")
+
+
 # 配置CORS中间件
 app.add_middleware(
     CORSMiddleware,
@@ -237,6 +306,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 配置指标采集中间件（纯ASGI，所有接口共用一次计时）
+app.add_middleware(MetricsMiddleware)
+
+# 响应压缩：列表接口返回大量中文文本，超过 1KB 的响应按客户端 Accept-Encoding 进行 gzip 压缩
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # 注册异常处理器
 app.add_exception_handler(BusinessException, business_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -244,24 +319,7 @@ app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 # 注册路由
-app.include_router(users_router)
-app.include_router(content_router)
-app.include_router(category_router)
-app.include_router(social_router)
-app.include_router(comment_router)
-app.include_router(like_router)
-app.include_router(follow_router)
-app.include_router(favorite_router)
-app.include_router(search_router)
-app.include_router(tag_router)
-app.include_router(ads_router)
-app.include_router(message_router)
-app.include_router(task_router)
-app.include_router(goods_router)
-app.include_router(order_router)
-app.include_router(payment_router)
-app.include_router(storage_router)
-app.include_router(interaction_router)
+_load_routers(app)
 
 # 健康检查接口
 @app.get("/health", tags=["系统"], summary="健康检查")
@@ -270,18 +328,11 @@ async def health_check():
     系统健康检查接口
     用于Nacos健康检查和负载均衡器检查
     """
-    # 检查数据库连接
-    try:
-        from app.database.connection import get_db
-        db = next(get_db())
-        db.execute("SELECT 1")
-        db.close()
-        db_status = "healthy"
-    except Exception:
-        db_status = "unhealthy"
+    # 检查数据库连接（异步连接池，不阻塞事件循环）
+    db_status = "healthy" if await check_async_db() else "unhealthy"
     
-    # 检查Nacos连接
-    nacos_status = "healthy" if nacos_client.send_heartbeat() else "unhealthy"
+    # 检查Nacos连接（结果短时缓存，未命中时在线程池中请求）
+    nacos_status = "healthy" if await asyncio.to_thread(nacos_client.check_heartbeat) else "unhealthy"
     
     return {
         "status": "healthy",
@@ -309,6 +360,13 @@ async def root():
     }
 
 
+# Prometheus指标接口
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus指标采集接口"""
+    return metrics_response()
+
+
 # Nacos心跳检查接口
 @app.get("/actuator/health", tags=["系统"], summary="Spring Boot风格健康检查")
 async def actuator_health():
@@ -327,5 +385,8 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
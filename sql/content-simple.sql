@@ -103,7 +103,9 @@ CREATE TABLE `t_user_content_purchase` (
     `update_time`       TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     
     PRIMARY KEY (`id`),
-    UNIQUE KEY `uk_user_content` (`user_id`, `content_id`)
+    UNIQUE KEY `uk_user_content` (`user_id`, `content_id`),
+    KEY `idx_user_content_status` (`user_id`, `content_id`, `status`),
+    KEY `idx_user_purchase_time` (`user_id`, `purchase_time`)
     
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='用户内容购买记录表';
 
@@ -32,6 +32,12 @@ CREATE INDEX idx_users_status_create_time ON t_users(status, create_time);
 -- 复合索引：角色+状态（权限筛选）
 CREATE INDEX idx_users_role_status ON t_users(role, status);
 
+-- 全文索引：用户名+昵称关键词搜索（ngram分词，替代 LIKE '%kw%' 全表扫描）
+ALTER TABLE t_user ADD FULLTEXT INDEX ft_user_search (username, nickname) WITH PARSER ngram;
+
+-- 拉黑列表：按拉黑者过滤并按创建时间倒序（含游标分页），索引顺序扫描免排序
+CREATE INDEX idx_user_create_time ON t_user_block(user_id, create_time);
+
 -- ================ 内容表索引 ================
 
 -- 内容类型索引（分类查询）
@@ -379,6 +385,11 @@ CREATE INDEX idx_user_content_purchase_content_id ON t_user_content_purchase(con
 CREATE INDEX idx_user_content_purchase_status ON t_user_content_purchase(status);
 CREATE INDEX idx_user_content_purchase_purchase_time ON t_user_content_purchase(purchase_time);
 CREATE INDEX idx_user_content_purchase_user_content ON t_user_content_purchase(user_id, content_id);
+CREATE INDEX idx_user_content_status ON t_user_content_purchase(user_id, content_id, status);
+CREATE INDEX idx_user_purchase_time ON t_user_content_purchase(user_id, purchase_time);
+
+-- 动态购买记录表索引
+CREATE INDEX idx_buyer_purchase_time ON t_social_dynamic_purchase(buyer_id, purchase_time);
 
 -- ================ 分类表索引 ================
 
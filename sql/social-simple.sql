@@ -72,6 +72,6 @@ CREATE TABLE `t_social_dynamic_purchase` (
   
   PRIMARY KEY (`id`),
   UNIQUE KEY `uk_dynamic_buyer` (`dynamic_id`, `buyer_id`),
-  KEY `idx_buyer_id` (`buyer_id`),
+  KEY `idx_buyer_purchase_time` (`buyer_id`, `purchase_time`),
   KEY `idx_purchase_time` (`purchase_time`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='动态购买记录表'; 
\ No newline at end of file
@@ -50,7 +50,8 @@ CREATE TABLE `t_user` (
     UNIQUE KEY `uk_email` (`email`),
     UNIQUE KEY `uk_phone` (`phone`),
     UNIQUE KEY `uk_invite_code` (`invite_code`),
-    KEY `idx_status` (`status`)
+    KEY `idx_status` (`status`),
+    FULLTEXT KEY `ft_user_search` (`username`, `nickname`) WITH PARSER ngram
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='用户统一信息表';
 
 
@@ -102,7 +103,7 @@ CREATE TABLE `t_user_block` (
     
     PRIMARY KEY (`id`),
     UNIQUE KEY `uk_user_blocked` (`user_id`, `blocked_user_id`),
-    KEY `idx_user_id` (`user_id`),
+    KEY `idx_user_create_time` (`user_id`, `create_time`),
     KEY `idx_blocked_user_id` (`blocked_user_id`),
     KEY `idx_status` (`status`),
     KEY `idx_create_time` (`create_time`)
@@ -11,6 +11,9 @@ if __name__ == "__main__":
         host=settings.host,
         port=8080,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
+        loop="uvloop",
+        http="httptools",
         log_level="debug" if settings.debug else "info",
         access_log=settings.debug
     )
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+测试公共配置
+
+- 配置模块在导入时读取当前目录下的 .env，本地未提供时使用 config.docker.env 中的示例配置
+- 缓存相关测试基于 fakeredis，并经由真实的 RedisClient 封装执行
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+from fakeredis import aioredis as fake_aioredis
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+if not os.path.exists(".env"):
+    _env_dir = tempfile.mkdtemp(prefix="collide-test-")
+    shutil.copy(os.path.join(ROOT_DIR, "config.docker.env"), os.path.join(_env_dir, ".env"))
+    _cwd = os.getcwd()
+    os.chdir(_env_dir)
+    import app.common.config  # noqa: E402,F401  在示例配置目录下完成配置加载
+    os.chdir(_cwd)
+
+from app.common.cache_service import CacheService  # noqa: E402
+from app.common.redis_client import RedisClient, RedisManager  # noqa: E402
+
+
+@pytest.fixture
+async def fake_redis():
+    """内存版 Redis（decode_responses 与生产配置一致）"""
+    redis = fake_aioredis.FakeRedis(decode_responses=True)
+    yield redis
+    await redis.flushall()
+    await redis.aclose()
+
+
+@pytest.fixture
+def cache(fake_redis) -> CacheService:
+    """使用 fakeredis 的 CacheService，请求经过 RedisClient 封装层"""
+    manager = RedisManager()
+    manager._redis = fake_redis
+    service = CacheService()
+    service.redis_client = RedisClient(manager)
+    return service
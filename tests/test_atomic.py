@@ -0,0 +1,55 @@
+"""
+事务提交后缓存失效测试
+"""
+import pytest
+
+import app.common.atomic as atomic
+from app.common.atomic import atomic_manager, invalidate_after_commit
+
+
+class FakeSession:
+    """只记录提交/回滚顺序的会话替身"""
+
+    def __init__(self, events):
+        self.info = {}
+        self.events = events
+
+    async def commit(self):
+        self.events.append("commit")
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+
+@pytest.fixture
+def atomic_cache(cache, monkeypatch):
+    monkeypatch.setattr(atomic, "cache_service", cache)
+    return cache
+
+
+async def test_invalidation_runs_after_commit(atomic_cache):
+    await atomic_cache.set("user:1", {"id": 1})
+    events = []
+    db = FakeSession(events)
+
+    async with atomic_manager.transaction(db):
+        invalidate_after_commit(db, "user:1")
+        # 提交前缓存仍在，避免并发读在提交前回填旧数据
+        assert await atomic_cache.get("user:1") == {"id": 1}
+
+    assert events == ["commit"]
+    assert await atomic_cache.get("user:1") is None
+    assert db.info == {}
+
+
+async def test_invalidation_dropped_on_rollback(atomic_cache):
+    await atomic_cache.set("user:1", {"id": 1})
+    db = FakeSession([])
+
+    with pytest.raises(ValueError):
+        async with atomic_manager.transaction(db):
+            invalidate_after_commit(db, "user:1")
+            raise ValueError("boom")
+
+    assert await atomic_cache.get("user:1") == {"id": 1}
+    assert db.info == {}
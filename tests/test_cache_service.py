@@ -0,0 +1,186 @@
+"""
+缓存服务测试
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.common.cache_service import (
+    CACHE_LOAD_WAIT_SECONDS, CACHE_MISSING, CACHE_MISSING_TTL, CACHE_TAG_TTL
+)
+from app.common.exceptions import BusinessException
+
+
+async def test_set_tagged_writes_value_and_registers_tag(cache, fake_redis):
+    assert await cache.set_tagged("user:list:a", {"total": 1}, "tag:user:list", ttl=300)
+
+    assert await cache.get("user:list:a") == {"total": 1}
+    assert await fake_redis.smembers("tag:user:list") == {"user:list:a"}
+    assert 0 < await fake_redis.ttl("tag:user:list") <= CACHE_TAG_TTL
+
+
+async def test_delete_many_with_tags_removes_members_keys_and_tag(cache, fake_redis):
+    await cache.set_tagged("user:list:a", [1], "tag:user:list", ttl=300)
+    await cache.set_tagged("user:list:b", [2], "tag:user:list", ttl=300)
+    await cache.set("user:1", {"id": 1})
+    await cache.set("user:2", {"id": 2})
+
+    assert await cache.delete_many("user:1", tags=["tag:user:list"])
+
+    assert await fake_redis.exists("user:list:a", "user:list:b", "tag:user:list", "user:1") == 0
+    assert await cache.get("user:2") == {"id": 2}
+
+
+async def test_invalidate_tag(cache, fake_redis):
+    await cache.set_tagged("user:list:count:a", 10, "tag:user:list", ttl=60)
+
+    assert await cache.invalidate_tag("tag:user:list")
+    assert await fake_redis.exists("user:list:count:a", "tag:user:list") == 0
+
+
+async def test_mget_returns_values_in_key_order(cache):
+    await cache.set("user:list:a", {"total": 3})
+    await cache.set("user:list:count:a", 3)
+
+    assert await cache.mget("user:list:a", "missing", "user:list:count:a") == [{"total": 3}, None, 3]
+
+
+async def test_missing_sentinel_cleared_with_list_tag(cache, fake_redis):
+    """新用户注册后：空值哨兵与用户列表缓存在同一次 delete_many 中清除"""
+    await cache.set_raw("user:username:alice", CACHE_MISSING, ttl=CACHE_MISSING_TTL)
+    await cache.set_tagged("user:list:a", [], "tag:user:list", ttl=300)
+
+    assert await cache.delete_many("user:7", "user:username:alice", tags=["tag:user:list"])
+
+    assert await cache.get_raw("user:username:alice") is None
+    assert await fake_redis.exists("user:list:a", "tag:user:list") == 0
+
+
+def _counting_loader(value: str = "payload", delay: float = 0):
+    calls = []
+
+    async def loader() -> str:
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+
+    return loader, calls
+
+
+async def test_get_or_load_raw_coalesces_concurrent_misses(cache, fake_redis):
+    loader, calls = _counting_loader(delay=0.05)
+
+    results = await asyncio.gather(*(cache.get_or_load_raw("content:feed:hot", loader, ttl=60) for _ in range(10)))
+
+    assert results == ["payload"] * 10
+    assert len(calls) == 1
+    assert await cache.get_raw("content:feed:hot") == "payload"
+    assert await fake_redis.exists("content:feed:hot:loading") == 0
+
+
+async def test_get_or_load_raw_waits_for_other_process(cache, fake_redis):
+    await fake_redis.set("content:feed:hot:loading", "1", ex=5)
+    loader, calls = _counting_loader()
+
+    async def other_process_fills_cache():
+        await asyncio.sleep(0.1)
+        await fake_redis.set("content:feed:hot", "from-other")
+
+    filler = asyncio.create_task(other_process_fills_cache())
+    assert await cache.get_or_load_raw("content:feed:hot", loader, ttl=60) == "from-other"
+    await filler
+    assert calls == []
+
+
+async def test_get_or_load_raw_loads_directly_when_redis_unavailable(cache):
+    async def init_fails():
+        raise ConnectionError("redis down")
+
+    manager = cache.redis_client.redis_manager
+    manager._redis = None
+    manager.init_redis = init_fails
+    loader, calls = _counting_loader()
+
+    started = time.monotonic()
+    assert await cache.get_or_load_raw("content:feed:hot", loader, ttl=60) == "payload"
+    assert time.monotonic() - started < CACHE_LOAD_WAIT_SECONDS / 2
+    assert len(calls) == 1
+
+
+async def _drain_background(cache):
+    await asyncio.gather(*cache._background_tasks)
+
+
+async def test_swr_refresh_replaces_stale_value_and_releases_lock(cache, fake_redis):
+    await cache.set_swr("wallet:1", {"coin": 1}, soft_ttl=0, ttl=60)
+    assert await cache.get_swr("wallet:1") == ({"coin": 1}, True)
+
+    async def loader():
+        return {"coin": 2}
+
+    await cache.refresh_swr("wallet:1", loader, soft_ttl=30, ttl=60)
+    await _drain_background(cache)
+
+    assert await cache.get_swr("wallet:1") == ({"coin": 2}, False)
+    assert await fake_redis.exists("wallet:1:refreshing") == 0
+
+
+async def test_swr_refresh_releases_lock_after_loader_failure(cache, fake_redis):
+    async def failing_loader():
+        raise RuntimeError("db down")
+
+    await cache.refresh_swr("wallet:1", failing_loader, soft_ttl=30, ttl=60)
+    await _drain_background(cache)
+
+    assert await fake_redis.exists("wallet:1:refreshing") == 0
+
+
+async def test_swr_refresh_skipped_while_another_refresh_runs(cache, fake_redis):
+    await fake_redis.set("wallet:1:refreshing", "1", ex=10)
+    loader, calls = _counting_loader()
+
+    await cache.refresh_swr("wallet:1", loader, soft_ttl=30, ttl=60)
+    await _drain_background(cache)
+
+    assert calls == []
+    assert await fake_redis.exists("wallet:1:refreshing") == 1
+
+
+async def test_run_idempotent_replays_first_result(cache):
+    calls = []
+
+    async def transfer():
+        calls.append(1)
+        return {"order_id": len(calls)}
+
+    first = await cache.run_idempotent("pay", 1, "key-1", transfer)
+    retry = await cache.run_idempotent("pay", 1, "key-1", transfer)
+
+    assert first == retry == {"order_id": 1}
+    assert len(calls) == 1
+
+
+async def test_run_idempotent_rejects_request_still_in_flight(cache, fake_redis):
+    await fake_redis.set("idem:pay:1:key-1", "1", ex=600)
+    loader, calls = _counting_loader()
+
+    with pytest.raises(BusinessException) as exc_info:
+        await cache.run_idempotent("pay", 1, "key-1", loader)
+
+    assert exc_info.value.code == 409
+    assert calls == []
+
+
+async def test_run_idempotent_releases_key_after_failure(cache, fake_redis):
+    async def failing():
+        raise BusinessException("余额不足")
+
+    with pytest.raises(BusinessException):
+        await cache.run_idempotent("pay", 1, "key-1", failing)
+
+    assert await fake_redis.exists("idem:pay:1:key-1") == 0
+    loader, calls = _counting_loader()
+    assert await cache.run_idempotent("pay", 1, "key-1", loader) == "payload"
+    assert len(calls) == 1
@@ -0,0 +1,61 @@
+"""
+内容榜单缓存预热测试
+"""
+import logging
+
+import pytest
+from fastapi.responses import Response
+
+from app.common.response import PaginationResponse
+from app.domains.content import async_router
+
+
+class _FakeSessionFactory:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def feed_handlers(monkeypatch):
+    """将四个榜单处理器替换为可控结果，返回结果表"""
+    results = {}
+
+    def _handler(name):
+        async def handler(**kwargs):
+            result = results.get(name)
+            if isinstance(result, Exception):
+                raise result
+            return result if result is not None else Response(content=b"{}", media_type="application/json")
+        handler.__name__ = name
+        return handler
+
+    monkeypatch.setattr(async_router, "AsyncSessionLocal", _FakeSessionFactory)
+    for name in ("get_hot_contents", "get_latest_contents", "get_recommended_contents", "get_trending_contents"):
+        monkeypatch.setattr(async_router, name, _handler(name))
+    return results
+
+
+async def test_warmup_logs_success_when_all_feeds_cached(feed_handlers, caplog):
+    with caplog.at_level(logging.INFO, logger=async_router.logger.name):
+        await async_router.warmup_feed_cache()
+
+    assert "内容榜单缓存预热完成" in caplog.text
+    assert "失败" not in caplog.text
+
+
+async def test_warmup_reports_swallowed_and_raised_failures(feed_handlers, caplog):
+    feed_handlers["get_hot_contents"] = PaginationResponse.create(
+        datas=[], total=0, current_page=1, page_size=20, message="获取热门内容失败，请稍后重试"
+    )
+    feed_handlers["get_trending_contents"] = RuntimeError("db down")
+
+    with caplog.at_level(logging.INFO, logger=async_router.logger.name):
+        await async_router.warmup_feed_cache()
+
+    assert "get_hot_contents" in caplog.text
+    assert "db down" in caplog.text
+    assert "2/4 个榜单失败" in caplog.text
+    assert "内容榜单缓存预热完成" not in caplog.text
@@ -0,0 +1,39 @@
+"""
+内容查询服务测试
+"""
+import warnings
+from datetime import datetime
+
+import orjson
+import pytest
+
+from app.common.pagination import PaginationParams, PaginationResult
+from app.domains.content import async_router
+from app.domains.content.schemas import ContentInfo, ContentQueryParams
+from app.domains.content.services import query_service
+
+
+def _content_info(content_id: int) -> ContentInfo:
+    return ContentInfo(
+        id=content_id, title=f"content{content_id}", content_type="NOVEL", author_id=1,
+        status="PUBLISHED", review_status="APPROVED", score_count=2, score_total=7,
+        publish_time=datetime(2024, 1, 2, 3, 4, 5), create_time=datetime(2024, 1, 1), update_time=datetime(2024, 1, 3),
+    )
+
+
+@pytest.mark.parametrize("dump_mode", ["json", "python"])
+async def test_feed_built_from_cached_list_matches_database_items(cache, monkeypatch, dump_mode):
+    """列表缓存命中时生成的榜单整页缓存与回源数据序列化结果一致"""
+    monkeypatch.setattr(query_service, "cache_service", cache)
+    monkeypatch.setattr(async_router, "cache_service", cache)
+    query_params, pagination = ContentQueryParams(status="PUBLISHED"), PaginationParams()
+    loaded = PaginationResult.create(items=[_content_info(1), _content_info(2)], total=2, page=1, page_size=20)
+    await cache.set(f"content:list:{cache.query_digest(query_params, pagination)}", loaded.model_dump(mode=dump_mode))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        response = await async_router._get_feed_response("latest", query_params, pagination, None, "ok")
+
+    body = orjson.loads(response.body)
+    assert body["data"] == [item.model_dump(mode="json", by_alias=True) for item in loaded.items]
+    assert body["data"][0]["create_time"] == "2024-01-01 00:00:00"
@@ -0,0 +1,50 @@
+"""
+用户门面服务事务边界测试
+"""
+from types import SimpleNamespace
+
+import pytest
+
+import app.common.atomic as atomic
+from app.common.exceptions import BusinessException
+from app.domains.users.async_service import UserAsyncService
+from tests.test_atomic import FakeSession
+
+
+class UpdateSession(FakeSession):
+    """UPDATE 返回固定影响行数的会话替身"""
+
+    def __init__(self, events, rowcount):
+        super().__init__(events)
+        self.rowcount = rowcount
+
+    async def execute(self, stmt):
+        self.events.append("execute")
+        return SimpleNamespace(rowcount=self.rowcount)
+
+
+@pytest.fixture
+def atomic_cache(cache, monkeypatch):
+    monkeypatch.setattr(atomic, "cache_service", cache)
+    return cache
+
+
+async def test_update_login_info_commits_once_then_invalidates(atomic_cache):
+    await atomic_cache.set("user:1", {"id": 1})
+    events = []
+
+    assert await UserAsyncService(UpdateSession(events, rowcount=1)).update_login_info(1)
+
+    assert events == ["execute", "commit"]
+    assert await atomic_cache.get("user:1") is None
+
+
+async def test_update_login_info_missing_user_rolls_back(atomic_cache):
+    await atomic_cache.set("user:1", {"id": 1})
+    events = []
+
+    with pytest.raises(BusinessException):
+        await UserAsyncService(UpdateSession(events, rowcount=0)).update_login_info(1)
+
+    assert events == ["execute", "rollback"]
+    assert await atomic_cache.get("user:1") == {"id": 1}
@@ -0,0 +1,133 @@
+"""
+用户查询服务测试
+"""
+import warnings
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.common.pagination import PaginationParams, PaginationResult
+from app.common.response import dump_pagination_json
+from app.domains.users.schemas import USER_INFO_LIST_ADAPTER, UserInfo, UserQuery
+from app.domains.users.services import query_service
+from app.domains.users.services.query_service import (
+    UserQueryService, _fulltext_keyword, _is_fulltext_index_missing
+)
+
+
+def _dbapi_error(code: int) -> DBAPIError:
+    return DBAPIError("SELECT 1", {}, Exception(code, "error"))
+
+
+def test_fulltext_keyword_strips_operators():
+    assert _fulltext_keyword('张三 +lee-"') == "+张三* +lee*"
+
+
+def test_fulltext_keyword_short_term_falls_back_to_like():
+    assert _fulltext_keyword("a") == ""
+    assert _fulltext_keyword("lee a") == ""
+    assert _fulltext_keyword("+-") == ""
+
+
+def test_only_missing_fulltext_index_triggers_fallback():
+    assert _is_fulltext_index_missing(_dbapi_error(1191))
+    assert not _is_fulltext_index_missing(_dbapi_error(2013))
+
+
+def _user_info(user_id: int) -> UserInfo:
+    return UserInfo(
+        id=user_id, username=f"user{user_id}", nickname=None, avatar=None, email=None, phone=None,
+        roles=["user"], status="active", bio=None, birthday=None,
+        last_login_time=datetime(2024, 1, 2, 3, 4, 5), create_time=datetime(2024, 1, 1),
+    )
+
+
+def _page_json(result: PaginationResult) -> bytes:
+    return dump_pagination_json(
+        USER_INFO_LIST_ADAPTER, result.items, result.total, result.page, result.page_size
+    )
+
+
+@pytest.mark.parametrize("dump_mode", ["json", "python"])
+async def test_cached_user_list_serializes_like_database_result(cache, monkeypatch, dump_mode):
+    """缓存命中与回源输出的响应体一致（含旧格式缓存：datetime 经 default=str 写入）"""
+    monkeypatch.setattr(query_service, "cache_service", cache)
+    query, pagination = UserQuery(), PaginationParams()
+    loaded = PaginationResult.create(items=[_user_info(1), _user_info(2)], total=2, page=1, page_size=20)
+    cache_key = f"user:list:{cache.query_digest(query, pagination)}"
+    await cache.set(cache_key, loaded.model_dump(mode=dump_mode))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        cached = await UserQueryService(db=None).get_user_list(query, pagination)
+        assert _page_json(cached) == _page_json(loaded)
+
+
+class _SavepointSession:
+    """记录保存点与会话回滚的假会话"""
+
+    def __init__(self):
+        self.events = []
+
+    def begin_nested(self):
+        session = self
+
+        class _Savepoint:
+            async def __aenter__(self):
+                session.events.append("savepoint")
+
+            async def __aexit__(self, exc_type, exc, tb):
+                session.events.append("rollback_savepoint" if exc_type else "release_savepoint")
+                return False
+
+        return _Savepoint()
+
+    async def rollback(self):
+        self.events.append("rollback")
+
+
+@pytest.fixture
+def list_query(cache, monkeypatch):
+    """替换实际查询，按 fulltext_keyword 是否为空记录走的是全文检索还是 LIKE；返回 (调用记录, 全文检索异常表)"""
+    monkeypatch.setattr(query_service, "cache_service", cache)
+    monkeypatch.setattr(query_service, "_fulltext_disabled_until", 0.0)
+    calls, errors = [], []
+
+    async def fake_query(self, query, pagination, cache_key, keyword, fulltext_keyword, *args):
+        calls.append("fulltext" if fulltext_keyword else "like")
+        if fulltext_keyword and errors:
+            raise errors.pop(0)
+        return PaginationResult.create(items=[], total=0, page=1, page_size=20)
+
+    monkeypatch.setattr(UserQueryService, "_query_user_list", fake_query)
+    return calls, errors
+
+
+async def test_missing_fulltext_index_rolls_back_only_savepoint(list_query, monkeypatch):
+    calls, errors = list_query
+    errors.append(_dbapi_error(1191))
+    session = _SavepointSession()
+    query = UserQuery(username="lee", nickname="lee")
+
+    await UserQueryService(session).get_user_list(query, PaginationParams())
+    assert calls == ["fulltext", "like"]
+    assert session.events == ["savepoint", "rollback_savepoint"]
+
+    # 降级期内直接走 LIKE，到期后重新尝试全文检索
+    await UserQueryService(session).get_user_list(query, PaginationParams(page=2))
+    assert calls[-1] == "like"
+    monkeypatch.setattr(query_service, "_fulltext_disabled_until", 0.0)
+    await UserQueryService(session).get_user_list(query, PaginationParams(page=3))
+    assert calls[-1] == "fulltext"
+
+
+async def test_other_database_errors_do_not_disable_fulltext(list_query):
+    calls, errors = list_query
+    errors.append(_dbapi_error(2013))
+    query = UserQuery(username="lee", nickname="lee")
+
+    with pytest.raises(DBAPIError):
+        await UserQueryService(_SavepointSession()).get_user_list(query, PaginationParams())
+    assert calls == ["fulltext"]
+    assert query_service._fulltext_disabled_until == 0.0